@@ -38,6 +38,15 @@ class Config(QConfig):
     # TODO: ADD YOUR CONFIG GROUP HERE
     saveFolder = ConfigItem("Download", "SaveFolder", QStandardPaths.writableLocation(QStandardPaths.DownloadLocation), FolderValidator())
 
+    # transcription: auto 表示根据是否检测到 CUDA 自动选择
+    whisperDevice = OptionsConfigItem(
+        "Transcription", "Device", "auto", OptionsValidator(["auto", "cuda", "cpu"]))
+    whisperComputeType = OptionsConfigItem(
+        "Transcription", "ComputeType", "auto",
+        OptionsValidator(["auto", "int8_float16", "float16", "int8", "float32"]))
+    whisperConcurrency = OptionsConfigItem(
+        "Transcription", "Concurrency", "auto", OptionsValidator(["auto", 1, 2, 3, 4]))
+
     # main window
     micaEnabled = ConfigItem("MainWindow", "MicaEnabled", isWin11(), BoolValidator())
     dpiScale = OptionsConfigItem(
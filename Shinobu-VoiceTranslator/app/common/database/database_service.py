@@ -4,9 +4,10 @@ import sqlite3
 from pathlib import Path
 from typing import List, Callable, Any, Optional, Dict
 from datetime import datetime
-from PySide6.QtCore import QObject, QThread, Signal
+from PySide6.QtCore import QObject, QThreadPool, Signal
 
 from .entity.task import Task, TaskStatus, TaskType
+from ..concurrent import TaskExecutor, Future
 
 
 class DatabaseService(QObject):
@@ -17,10 +18,14 @@ class DatabaseService(QObject):
     
     def __init__(self, db_path: str = "data/tasks.db"):
         super().__init__()
-        self.db_path = Path(db_path)
+        # 解析为绝对路径：写库在工作线程中进行，期间工作目录可能被临时切换（如 B站下载）
+        self.db_path = Path(db_path).absolute()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._active_workers = []  # 跟踪活动的工作线程
         self._init_database()
+
+        # 所有服务共用的写库线程池：单线程，各批次按提交顺序执行，最终状态不会被较早的进度覆盖
+        self._writer = TaskExecutor(useGlobalThreadPool=False)
+        self._writer.threadPool.setMaxThreadCount(1)
     
     def _init_database(self):
         """初始化数据库表结构"""
@@ -113,6 +118,31 @@ class DatabaseService(QObject):
             print(f"保存任务失败: {e}")
             return False
     
+    def save_rows(self, rows: List[Dict[str, Any]]):
+        """
+        批量写入已序列化的任务行（Task.toDict 的结果），所有写入在同一个事务中提交
+        
+        只接触传入的行数据，不读取任务对象，可在工作线程中调用；失败时抛出异常
+        """
+        if not rows:
+            return
+
+        columns = ', '.join(rows[0].keys())
+        placeholders = ', '.join(['?' for _ in rows[0]])
+
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            with conn:
+                conn.executemany(f'''
+                    INSERT OR REPLACE INTO tasks ({columns}) VALUES ({placeholders})
+                ''', [tuple(row.values()) for row in rows])
+        finally:
+            conn.close()
+
+    def saveRowsAsync(self, rows: List[Dict[str, Any]]) -> Future:
+        """将行数据提交到共用的写库线程，返回的 Future 在主线程中发射结果"""
+        return self._writer.asyncRun(self.save_rows, rows)
+
     def get_task(self, task_id: str) -> Optional[Task]:
         """根据ID获取单个任务"""
         try:
@@ -380,46 +410,9 @@ class DatabaseService(QObject):
         return Task(**data)
     
     def cleanup(self):
-        """清理所有活动的工作线程"""
-        for worker in self._active_workers[:]:
-            if worker and worker.isRunning():
-                worker.stop()
-                worker.wait(1000)  # 等待最多1秒
-                if worker.isRunning():
-                    worker.terminate()  # 强制终止
-            self._active_workers.remove(worker)
-        self._active_workers.clear()
-
-
-class AsyncDatabaseWorker(QThread):
-    """异步数据库工作线程"""
-    finished = Signal(object)  # 完成信号，返回结果
-    error = Signal(str)        # 错误信号
-    
-    def __init__(self, db_service: DatabaseService, method_name: str, *args, **kwargs):
-        super().__init__()
-        self.db_service = db_service
-        self.method_name = method_name
-        self.args = args
-        self.kwargs = kwargs
-        self._is_running = True
-    
-    def run(self):
-        """执行数据库操作"""
-        try:
-            if not self._is_running:
-                return
-            method = getattr(self.db_service, self.method_name)
-            result = method(*self.args, **self.kwargs)
-            if self._is_running:
-                self.finished.emit(result)
-        except Exception as e:
-            if self._is_running:
-                self.error.emit(str(e))
-    
-    def stop(self):
-        """停止工作线程"""
-        self._is_running = False
+        """等待已提交的写库批次全部完成，以及进行中的异步数据库请求"""
+        self._writer.threadPool.waitForDone()           # 各服务退出时提交的最终状态必须写入
+        QThreadPool.globalInstance().waitForDone(1000)  # 等待最多1秒
 
 
 # 全局数据库实例
@@ -439,7 +432,7 @@ def getTaskService() -> DatabaseService:
     return getDatabaseService()
 
 
-def sqlRequest(service_name: str, method_name: str, callback: Callable, *args, **kwargs):
+def sqlRequest(service_name: str, method_name: str, callback: Callable, *args, **kwargs) -> Optional[Future]:
     """异步数据库请求
     
     Args:
@@ -459,26 +452,12 @@ def sqlRequest(service_name: str, method_name: str, callback: Callable, *args, *
         }
         actual_method = method_map.get(method_name, method_name)
         
-        worker = AsyncDatabaseWorker(db, actual_method, *args, **kwargs)
+        # 在全局线程池中执行，回调会在主线程中调用
+        future = TaskExecutor.runTask(getattr(db, actual_method), *args, **kwargs)
         if callback:
-            worker.finished.connect(callback)
-        
-        # 跟踪工作线程
-        db._active_workers.append(worker)
-        
-        # 完成后从列表中移除
-        def on_finished(result):
-            if worker in db._active_workers:
-                db._active_workers.remove(worker)
-        
-        def on_error(error):
-            if worker in db._active_workers:
-                db._active_workers.remove(worker)
-        
-        worker.finished.connect(on_finished)
-        worker.error.connect(on_error)
-        
-        worker.start()
-        return worker
+            future.result.connect(callback)
+
+        future.failed.connect(lambda e: print(f"数据库请求失败: {e}"))
+        return future
     
     return None
\ No newline at end of file
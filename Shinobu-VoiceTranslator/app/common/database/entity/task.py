@@ -3,7 +3,15 @@ from enum import Enum
 from datetime import datetime
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
+from pathlib import Path
 import uuid
+import json
+import copy
+from functools import partial
+
+
+# 紧凑且不转义中文的 JSON 序列化，保存任务时使用
+_dumps = partial(json.dumps, ensure_ascii=False, separators=(',', ':'))
 
 
 class TaskStatus(Enum):
@@ -192,6 +200,9 @@ class Task:
     # 优先级
     priority: int = 0           # 优先级（数字越大优先级越高）
     
+    # 已序列化的配置缓存 (配置快照, JSON 字符串)，配置未变化时保存任务不再重复序列化
+    _configCache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         """初始化后处理"""
         if isinstance(self.status, str):
@@ -222,6 +233,32 @@ class Task:
         """设置任务来源"""
         self.metadata['source'] = value
     
+    @property
+    def coverPath(self) -> str:
+        """获取封面路径"""
+        return self.metadata.get('coverPath', '')
+    
+    @coverPath.setter
+    def coverPath(self, value: str):
+        """设置封面路径，同时记录封面文件是否存在及其修改时间（只访问一次文件系统）"""
+        try:
+            mtime = Path(value).stat().st_mtime_ns if value else None
+        except OSError:
+            mtime = None
+        self.metadata['coverPath'] = value
+        self.metadata['coverExists'] = mtime is not None
+        self.metadata['coverMtime'] = mtime
+    
+    @property
+    def coverExists(self) -> bool:
+        """封面文件是否存在（在设置封面路径时检查，避免界面创建时访问文件系统）"""
+        return self.metadata.get('coverExists', False)
+    
+    @property
+    def coverMtime(self) -> Optional[int]:
+        """设置封面路径时记录的封面修改时间（纳秒），封面被重写后重新设置路径即可更新"""
+        return self.metadata.get('coverMtime')
+    
     @property
     def isDownloadTask(self) -> bool:
         """是否为下载任务"""
@@ -282,9 +319,16 @@ class Task:
         """获取进度百分比字符串"""
         return f"{self.progress:.1f}%"
     
+    def _configJson(self) -> str:
+        """获取配置的 JSON 字符串，配置内容未变化时复用上次的结果"""
+        cache = self._configCache
+        if cache is None or cache[0] != self.config:
+            # 深拷贝作为比较基准，配置中的列表等嵌套值被原地修改时也能发现变化
+            cache = self._configCache = (copy.deepcopy(self.config), _dumps(self.config))
+        return cache[1]
+    
     def toDict(self) -> Dict[str, Any]:
         """转换为字典"""
-        import json
         return {
             'id': self.id,
             'type': self.type,
@@ -295,7 +339,7 @@ class Task:
             'url': self.url,
             'inputPath': self.inputPath,
             'outputPath': self.outputPath,
-            'outputPaths': json.dumps(self.outputPaths),
+            'outputPaths': _dumps(self.outputPaths),
             'logFile': self.logFile,
             'progress': self.progress,
             'speed': self.speed,
@@ -313,9 +357,9 @@ class Task:
             'errorCode': self.errorCode,
             'retryCount': self.retryCount,
             'maxRetry': self.maxRetry,
-            'config': json.dumps(self.config),
-            'metadata': json.dumps(self.metadata),
-            'tags': json.dumps(self.tags),
+            'config': self._configJson(),
+            'metadata': _dumps(self.metadata),
+            'tags': _dumps(self.tags),
             'category': self.category,
             'priority': self.priority,
         }
\ No newline at end of file
@@ -18,8 +18,8 @@ class SignalBus(QObject):
     # 任务重启信号
     restartTask = Signal(object)  # Task
 
-    # 日志生成信号 (service_type, level, message)
-    logGenerated = Signal(object, str, str)  # TaskType, level, message
+    # 日志生成信号 (service_type, [(level, message), ...])，按批次发射
+    logsGenerated = Signal(object, list)  # TaskType, logs
     
     # 任务信号 (service_type, task)
     taskCreated = Signal(object, object)  # TaskType, Task
@@ -194,10 +194,10 @@ class TranscribeConfigCard(GroupHeaderCardWidget):
     
     def _loadWhisperModels(self):
         """加载可用的 Whisper 模型到下拉菜单"""
-        from ..services.transcription_service import transcriptionService
+        from ..services.transcription_service import getTranscriptionService
         
         # 获取可用模型列表
-        available_models = transcriptionService.get_available_models()
+        available_models = getTranscriptionService().get_available_models()
         
         # 添加基础选项
         model_items = []
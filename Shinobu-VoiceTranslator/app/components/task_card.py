@@ -1,21 +1,79 @@
 # coding:utf-8
+from collections import deque
 from pathlib import Path
 import sys
-from PySide6.QtCore import Qt, Signal, Property, QFileInfo, QSize
-from PySide6.QtGui import QPixmap, QPainter, QFont, QColor, QPen
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QFileIconProvider
+from PySide6.QtCore import Qt, Signal, Property, QFileInfo, QSize, QTimer
+from PySide6.QtGui import QPixmap, QPixmapCache, QPainter, QPainterPath, QFont, QColor, QPen
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QLayout, QFileIconProvider
 
 from qfluentwidgets import (CardWidget, IconWidget, ToolButton, FluentIcon,
                             BodyLabel, CaptionLabel, ProgressBar, ImageLabel, setFont,
                             MessageBoxBase, SubtitleLabel, CheckBox, InfoBar, InfoBarPosition,
                             PushButton, ToolTipFilter, InfoLevel, DotInfoBadge, MessageBox,
-                            isDarkTheme, themeColor, RoundMenu, Action, MenuAnimationType)
+                            isDarkTheme, themeColor, RoundMenu, Action, MenuAnimationType, qconfig)
 
 from ..common.signal_bus import signalBus
 from ..services.downloadservice.download_service import UnifiedDownloadService
 from ..common.database.entity.task import Task, TaskStatus
 from ..common.database import sqlRequest
 from ..common.utils import removeFile, showInFolder, openUrl
+from ..common.config import cfg
+
+
+COVER_SIZE = QSize(112, 63)     # 封面尺寸 16:9
+
+
+def cachedPixmap(key: str, factory) -> QPixmap:
+    """从 Qt 全局图像缓存中获取图像，未命中时调用 factory 生成并缓存"""
+    pixmap = QPixmap()
+    if QPixmapCache.find(key, pixmap):
+        return pixmap
+
+    pixmap = factory()
+    QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def _getCover(path, mtime, ratio: float = 1.0) -> QPixmap:
+    """
+    获取按设备像素比缩放后的封面，同一文件在同一缩放比下只解码一次
+
+    mtime 为任务中记录的封面修改时间，封面被重写后缓存键随之变化，无需在此访问文件系统
+    """
+    path = str(path)
+    key = f"taskCard/cover/{path}/{mtime}/{ratio}"
+
+    def factory():
+        # 按物理像素缩放，高分屏下不模糊
+        pixmap = QPixmap(path).scaled(
+            COVER_SIZE * ratio, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        pixmap.setDevicePixelRatio(ratio)
+        return pixmap
+
+    return cachedPixmap(key, factory)
+
+
+def _getFileIcon(path) -> QPixmap:
+    """获取文件类型图标，同类型文件共用一份缓存"""
+    path = str(path)
+    key = f"taskCard/fileIcon/{Path(path).suffix.lower()}"
+    return cachedPixmap(key, lambda: QFileIconProvider().icon(QFileInfo(path)).pixmap(32, 32))
+
+
+class LazyTipButton(ToolButton):
+    """首次悬停时才安装提示过滤器的工具按钮"""
+
+    _tipFilter = None
+
+    def enterEvent(self, e):
+        if self._tipFilter is None:
+            self._tipFilter = ToolTipFilter(self)
+            self.installEventFilter(self._tipFilter)
+            # 过滤器安装晚于本次进入事件，需手动转发一次以显示提示
+            self._tipFilter.eventFilter(self, e)
+
+        super().enterEvent(e)
+
 
 class TaskCardBase(CardWidget):
     """任务卡片基类"""
@@ -23,13 +81,24 @@ class TaskCardBase(CardWidget):
     deleted = Signal()
     checkedChanged = Signal(bool)
 
+    _pools = {}         # 卡片类 -> 闲置卡片队列
+    POOL_SIZE = 32      # 每种卡片最多缓存的闲置数量
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.checkBox = CheckBox()
         self.checkBox.setFixedSize(23, 23)
+        self._updatePending = False     # 是否已有待执行的重绘
+        self._selPixmap = None          # 缓存的选中边框图像
+        self._selPixmapSize = QSize()   # 缓存图像对应的卡片尺寸
+        self._selPixmapRatio = 0.0      # 缓存图像对应的设备像素比
+        self._cachedRect = None         # 缓存的边框矩形
+        self._cachedPath = None         # 缓存的圆角边框路径
         self.setSelectionMode(False)
 
         self.checkBox.stateChanged.connect(self._onCheckChanged)
+        qconfig.themeChanged.connect(self._invalidateSelPixmap)
+        qconfig.themeColorChanged.connect(self._invalidateSelPixmap)
 
     def setSelectionMode(self, enter: bool):
         # 选择模式切换
@@ -48,6 +117,53 @@ class TaskCardBase(CardWidget):
     # 删除逻辑
     def removeTask(self):
         raise NotImplementedError
+
+    # 卡片复用：从闲置队列取出卡片并绑定新任务，避免重复创建控件
+    @classmethod
+    def acquire(cls, task: Task, parent=None) -> "TaskCardBase":
+        pool = TaskCardBase._pools.get(cls)
+        if not pool:
+            return cls(task, parent)
+
+        card = pool.pop()
+        card.setParent(parent)
+        card.rebind(task)
+        return card
+
+    def release(self):
+        """断开外部连接并放回闲置队列"""
+        for signal in (self.deleted, self.checkedChanged):
+            try:
+                signal.disconnect()
+            except (RuntimeError, TypeError):
+                pass
+
+        self.setSelectionMode(False)
+        self.hide()
+
+        pool = TaskCardBase._pools.setdefault(type(self), deque())
+        if len(pool) < self.POOL_SIZE:
+            pool.append(self)
+        else:
+            self.deleteLater()
+
+    def rebind(self, task: Task):
+        """绑定新的任务对象并刷新显示"""
+        raise NotImplementedError
+
+    def _fillHBox(self, box: QHBoxLayout, items: list):
+        """一次性填充布局：整数为间距，其余为控件或子布局，填充完成后只激活一次"""
+        self.setUpdatesEnabled(False)
+        for item in items:
+            if isinstance(item, int):
+                box.addSpacing(item)
+            elif isinstance(item, QLayout):
+                box.addLayout(item)
+            else:
+                box.addWidget(item)
+
+        self.setUpdatesEnabled(True)
+        box.activate()
     
     # 鼠标交互逻辑
     def mouseReleaseEvent(self, e):
@@ -69,20 +185,76 @@ class TaskCardBase(CardWidget):
     def _onCheckChanged(self):
         self.setChecked(self.checkBox.isChecked())
         self.checkedChanged.emit(self.checkBox.isChecked())
-        self.update()
+        self._scheduleUpdate()
+
+    # 合并重绘请求，全选时多张卡片只在同一帧内重绘一次
+    def _scheduleUpdate(self):
+        if self._updatePending:
+            return
+
+        self._updatePending = True
+        QTimer.singleShot(16, self._flushUpdate)
+
+    def _flushUpdate(self):
+        self._updatePending = False
+        super().update()
 
     # 自定义绘制
     def paintEvent(self, e):
+        # 卡片不可见或没有需要重绘的区域时直接跳过
+        if e.region().isEmpty() or not self.isVisible():
+            return
+
         if not (self.isSelectionMode and self.isChecked()):
             return super().paintEvent(e)
 
+        # 尺寸或设备像素比（窗口移到缩放比不同的屏幕）变化时重新生成
+        if (self._selPixmap is None or self._selPixmapSize != self.size()
+                or self._selPixmapRatio != self.devicePixelRatioF()):
+            self._updateSelPixmap()
+
+        # 只绘制被标记为脏的区域
         painter = QPainter(self)
+        painter.setClipRect(e.rect())
+        painter.drawPixmap(0, 0, self._selPixmap)
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._cachedRect = None
+        self._cachedPath = None
+        self._invalidateSelPixmap()
+
+    def _selectionPath(self) -> QPainterPath:
+        if self._cachedPath is None:
+            r = self.borderRadius
+            self._cachedRect = self.rect().adjusted(2, 2, -2, -2)
+            path = QPainterPath()
+            path.addRoundedRect(self._cachedRect, r, r)
+            self._cachedPath = path
+
+        return self._cachedPath
+
+    # 选中边框缓存，仅在尺寸、设备像素比或主题变化时重新生成
+    def _updateSelPixmap(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
         painter.setRenderHints(QPainter.Antialiasing)
 
-        r = self.borderRadius
         painter.setPen(QPen(themeColor(), 2))
         painter.setBrush(QColor(255, 255, 255, 15) if isDarkTheme() else QColor(0, 0, 0, 8))
-        painter.drawRoundedRect(self.rect().adjusted(2, 2, -2, -2), r, r)
+        painter.drawPath(self._selectionPath())
+        painter.end()
+
+        self._selPixmap = pixmap
+        self._selPixmapSize = self.size()
+        self._selPixmapRatio = ratio
+
+    def _invalidateSelPixmap(self):
+        self._selPixmap = None
 
 class ProgressingTaskCard(TaskCardBase):
     """任务进行中卡片"""
@@ -95,18 +267,21 @@ class ProgressingTaskCard(TaskCardBase):
 
         # 核心显示控件
         self.task = task                                        # 绑定的任务对象
+        self._fullPath = self._taskFilePath(task)               # 任务文件完整路径
         self.imageLabel = ImageLabel()                          # 文件类型图标
         self.fileNameLabel = BodyLabel(task.fileName)           # 文件名
         self.progressBar = ProgressBar()                        # 任务进度条
+        self._lastPct = -1                                      # 进度条当前显示的整数进度
         
         # 核心信息控件
         
 
         # 操作按钮
-        self.openFolderButton = ToolButton(FluentIcon.FOLDER)     # 打开文件夹按钮
-        self.deleteButton = ToolButton(FluentIcon.DELETE)       # 删除任务按钮
+        self.openFolderButton = LazyTipButton(FluentIcon.FOLDER)     # 打开文件夹按钮
+        self.deleteButton = LazyTipButton(FluentIcon.DELETE)       # 删除任务按钮
 
         self._initWidget()
+        self.updateProgress()                                   # 显示任务当前进度（与 rebind 一致）
 
     def _initWidget(self):
         # 设置文件图标
@@ -116,11 +291,9 @@ class ProgressingTaskCard(TaskCardBase):
         # 设置工具提示
         self.openFolderButton.setToolTip(self.tr("打开保存目录"))
         self.openFolderButton.setToolTipDuration(3000)    # 悬停3秒显示提示
-        self.openFolderButton.installEventFilter(ToolTipFilter(self.openFolderButton))
 
         self.deleteButton.setToolTip(self.tr("删除文件"))
         self.deleteButton.setToolTipDuration(3000)
-        self.deleteButton.installEventFilter(ToolTipFilter(self.deleteButton))
 
         # 设置文件名样式
         setFont(self.fileNameLabel, 18, QFont.Weight.Bold)
@@ -130,16 +303,9 @@ class ProgressingTaskCard(TaskCardBase):
         self._connectSignalToSlot()
 
     def _initLayout(self):
-        # 水平布局 从走往右
-        self.hBoxLayout.setContentsMargins(20, 11, 20, 11)
-        self.hBoxLayout.addWidget(self.checkBox)                # 复选框
-        self.hBoxLayout.addSpacing(5)                           # 间距
-        self.hBoxLayout.addWidget(self.imageLabel)              # 文件图标
-        self.hBoxLayout.addSpacing(5)                           
-        self.hBoxLayout.addLayout(self.vBoxLayout)              # 主内容区域
-        self.hBoxLayout.addSpacing(20)
-        self.hBoxLayout.addWidget(self.openFolderButton)        # 打开文件夹按钮
-        self.hBoxLayout.addWidget(self.deleteButton)            # 删除文件按钮
+        # 信息行布局：状态信息水平排列
+        self.infoLayout.setContentsMargins(0, 0, 0, 0)
+        self.infoLayout.setSpacing(3)
 
         # 垂直布局 从上到下
         self.vBoxLayout.setSpacing(5)
@@ -148,17 +314,42 @@ class ProgressingTaskCard(TaskCardBase):
         self.vBoxLayout.addLayout(self.infoLayout)              # 信息行
         self.vBoxLayout.addWidget(self.progressBar)             # 进度条
 
-        # 信息行布局：状态信息水平排列
-        self.infoLayout.setContentsMargins(0, 0, 0, 0)
-        self.infoLayout.setSpacing(3)
+        # 水平布局 从左往右
+        self.hBoxLayout.setContentsMargins(20, 11, 20, 11)
+        self._fillHBox(self.hBoxLayout, [
+            self.checkBox, 5,                                   # 复选框
+            self.imageLabel, 5,                                 # 文件图标
+            self.vBoxLayout, 20,                                # 主内容区域
+            self.openFolderButton,                              # 打开文件夹按钮
+            self.deleteButton,                                  # 删除文件按钮
+        ])
         
     def _connectSignalToSlot(self):
         self.openFolderButton.clicked.connect(self._onOpenButtonClicked)
         self.deleteButton.clicked.connect(self._onDeleteButtonClicked)
 
+    @staticmethod
+    def _taskFilePath(task: Task) -> Path:
+        # Task 没有 saveFolder 字段时使用默认保存目录
+        saveFolder = getattr(task, 'saveFolder', None) or cfg.get(cfg.saveFolder)
+        return Path(saveFolder) / task.fileName
+
     def _onOpenButtonClicked(self):
-        path = Path(self.task.saveFolder) / self.task.fileName
-        showInFolder(path)
+        showInFolder(self._fullPath)
+
+    def rebind(self, task: Task):
+        self.task = task
+        self._fullPath = self._taskFilePath(task)
+        self.fileNameLabel.setText(task.fileName)
+        self._lastPct = -1
+        self.updateProgress()
+
+    def updateProgress(self):
+        # 整数进度未变化时不更新进度条，避免频繁重绘
+        pct = int(self.task.progress)
+        if pct != self._lastPct:
+            self.progressBar.setValue(pct)
+            self._lastPct = pct
 
     def removeTask(self, deleteFile=False):
         if not self.task.isRunning():
@@ -186,58 +377,46 @@ class SuccessTaskCard(TaskCardBase):
         
 
         # 操作按钮（多一个重新开始）
-        self.restartButton = ToolButton(FluentIcon.UPDATE)
-        self.openFolderButton = ToolButton(FluentIcon.FOLDER)
-        self.deleteButton = ToolButton(FluentIcon.DELETE)
+        self.restartButton = LazyTipButton(FluentIcon.UPDATE)
+        self.openFolderButton = LazyTipButton(FluentIcon.FOLDER)
+        self.deleteButton = LazyTipButton(FluentIcon.DELETE)
 
         self._initWidget()
 
     def _initWidget(self):
         # 设置封面图像尺寸和圆角
-        self.imageLabel.setScaledSize(QSize(112, 63))  # 16:9 比例
+        self.imageLabel.setScaledSize(COVER_SIZE)      # 16:9 比例
         self.imageLabel.setBorderRadius(4, 4, 4, 4)    # 4像素圆角
         self.createTimeIcon.setFixedSize(16, 16)
         
 
         # 检查并更新封面
-        if hasattr(self.task, 'coverPath') and self.task.coverPath and Path(self.task.coverPath).exists():
+        if self.task.coverExists:
             self.updateCover()
 
         self.restartButton.setToolTip(self.tr("重新开始"))
         self.restartButton.setToolTipDuration(3000)
-        self.restartButton.installEventFilter(ToolTipFilter(self.restartButton))
 
         self.openFolderButton.setToolTip(self.tr("打开目录"))
         self.openFolderButton.setToolTipDuration(3000)
-        self.openFolderButton.installEventFilter(ToolTipFilter(self.openFolderButton))
 
         self.deleteButton.setToolTip(self.tr("删除文件"))
         self.deleteButton.setToolTipDuration(3000)
-        self.deleteButton.installEventFilter(ToolTipFilter(self.deleteButton))
 
         setFont(self.fileNameLabel, 18, QFont.Weight.Bold)
         self.fileNameLabel.setWordWrap(True)
 
-        if hasattr(self.task, 'coverPath') and self.task.coverPath and Path(self.task.coverPath).exists():
-            self.updateCover()
-
         self._initLayout()
         self._connectSignalToSlot()
 
     def _initLayout(self):
-        # 主布局
-        self.hBoxLayout.setContentsMargins(20, 11, 20, 11)
-        self.hBoxLayout.addWidget(self.checkBox)
-        self.hBoxLayout.addSpacing(5)
-        self.hBoxLayout.addWidget(self.imageLabel)      # 封面图片
-        self.hBoxLayout.addSpacing(5)
-        self.hBoxLayout.addLayout(self.vBoxLayout)
-        self.hBoxLayout.addSpacing(20)
-
-        # 按键顺序
-        self.hBoxLayout.addWidget(self.restartButton)
-        self.hBoxLayout.addWidget(self.openFolderButton)
-        self.hBoxLayout.addWidget(self.deleteButton)
+        # 信息行布局
+        self.infoLayout.setContentsMargins(0, 0, 0, 0)
+
+        # 创建时间相关信息
+        self.infoLayout.setSpacing(3)
+        self.infoLayout.addWidget(self.createTimeIcon)
+        self.infoLayout.addWidget(self.createTimeLabel, 0, Qt.AlignmentFlag.AlignLeft)
 
         # 垂直布局
         self.vBoxLayout.setSpacing(5)
@@ -245,17 +424,35 @@ class SuccessTaskCard(TaskCardBase):
         self.vBoxLayout.addWidget(self.fileNameLabel)
         self.vBoxLayout.addLayout(self.infoLayout)
 
-        # 信息行布局
-        self.infoLayout.setContentsMargins(0, 0, 0, 0)
+        # 主布局
+        self.hBoxLayout.setContentsMargins(20, 11, 20, 11)
+        self._fillHBox(self.hBoxLayout, [
+            self.checkBox, 5,
+            self.imageLabel, 5,     # 封面图片
+            self.vBoxLayout, 20,
 
-        # 创建时间相关信息
-        self.infoLayout.setSpacing(3)
-        self.infoLayout.addWidget(self.createTimeIcon)
-        self.infoLayout.addWidget(self.createTimeLabel, 0, Qt.AlignmentFlag.AlignLeft)
+            # 按键顺序
+            self.restartButton,
+            self.openFolderButton,
+            self.deleteButton,
+        ])
 
     def updateCover(self):
-        self.imageLabel.setImage(str(self.task.coverPath))
-        self.imageLabel.setScaledSize(QSize(112, 63))
+        self.imageLabel.setImage(_getCover(self.task.coverPath, self.task.coverMtime, self.devicePixelRatioF()))
+        # 封面已缩放到目标尺寸，尺寸一致时无需再触发布局更新
+        if self.imageLabel.size() != COVER_SIZE:
+            self.imageLabel.setScaledSize(COVER_SIZE)
+
+    def rebind(self, task: Task):
+        self.task = task
+        self.fileNameLabel.setText(task.fileName)
+        self.createTimeLabel.setText(task.createTime.strftime("%Y-%m-%d %H:%M:%S"))
+
+        if task.coverExists:
+            self.updateCover()
+        else:
+            self.imageLabel.setImage(None)
+            self.imageLabel.setScaledSize(COVER_SIZE)
 
     # 文件操作功能
     def _onOpenButtonClicked(self):
@@ -297,26 +494,22 @@ class FailedTaskCard(TaskCardBase):
             task.createTime.strftime("%Y-%m-%d %H:%M:%S"))
         
 
-        self.restartButton = ToolButton(FluentIcon.UPDATE)
-        self.logButton = ToolButton(FluentIcon.COMMAND_PROMPT)
-        self.deleteButton = ToolButton(FluentIcon.DELETE)
+        self.restartButton = LazyTipButton(FluentIcon.UPDATE)
+        self.logButton = LazyTipButton(FluentIcon.COMMAND_PROMPT)
+        self.deleteButton = LazyTipButton(FluentIcon.DELETE)
 
         self._initWidget()
 
     def _initWidget(self):
         if hasattr(self.task, 'videoPath') and self.task.videoPath:
-            self.imageLabel.setImage(QFileIconProvider().icon(
-                QFileInfo(self.task.videoPath)).pixmap(32, 32))
+            self.imageLabel.setImage(_getFileIcon(self.task.videoPath))
         self.createTimeIcon.setFixedSize(16, 16)
 
         self.restartButton.setToolTip(self.tr("重新开始"))
         self.restartButton.setToolTipDuration(3000)
-        self.restartButton.installEventFilter(
-            ToolTipFilter(self.restartButton))
 
         self.logButton.setToolTip(self.tr("查看错误日志"))
         self.logButton.setToolTipDuration(3000)
-        self.logButton.installEventFilter(ToolTipFilter(self.logButton))
 
         setFont(self.fileNameLabel, 18, QFont.Weight.Bold)
         self.fileNameLabel.setWordWrap(True)
@@ -325,26 +518,6 @@ class FailedTaskCard(TaskCardBase):
         self._connectSignalToSlot()
 
     def _initLayout(self):
-        self.hBoxLayout.setContentsMargins(20, 11, 20, 11)
-        self.hBoxLayout.addWidget(self.checkBox)
-        self.hBoxLayout.addSpacing(5)
-
-        self.hBoxLayout.addWidget(self.imageLabel)
-        self.hBoxLayout.addSpacing(5)
-
-        self.hBoxLayout.addLayout(self.vBoxLayout)
-        self.hBoxLayout.addSpacing(20)
-
-        self.hBoxLayout.addWidget(self.restartButton)
-        self.hBoxLayout.addWidget(self.logButton)
-        self.hBoxLayout.addWidget(self.deleteButton)
-
-        # 垂直布局
-        self.vBoxLayout.setSpacing(5)
-        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
-        self.vBoxLayout.addWidget(self.fileNameLabel)
-        self.vBoxLayout.addLayout(self.infoLayout)
-        
         # 信息行布局
         self.infoLayout.setContentsMargins(0, 0, 0, 0)
         self.infoLayout.setSpacing(3)
@@ -352,9 +525,35 @@ class FailedTaskCard(TaskCardBase):
         self.infoLayout.addWidget(self.createTimeLabel, 0, Qt.AlignmentFlag.AlignLeft)
         self.infoLayout.addStretch(1)
 
+        # 垂直布局
+        self.vBoxLayout.setSpacing(5)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.vBoxLayout.addWidget(self.fileNameLabel)
+        self.vBoxLayout.addLayout(self.infoLayout)
+
+        self.hBoxLayout.setContentsMargins(20, 11, 20, 11)
+        self._fillHBox(self.hBoxLayout, [
+            self.checkBox, 5,
+            self.imageLabel, 5,
+            self.vBoxLayout, 20,
+            self.restartButton,
+            self.logButton,
+            self.deleteButton,
+        ])
+
     def _onLogButtonClicked(self):
         openUrl(self.task.logFile)
 
+    def rebind(self, task: Task):
+        self.task = task
+        self.fileNameLabel.setText(task.fileName)
+        self.createTimeLabel.setText(task.createTime.strftime("%Y-%m-%d %H:%M:%S"))
+
+        if hasattr(task, 'videoPath') and task.videoPath:
+            self.imageLabel.setImage(_getFileIcon(task.videoPath))
+        else:
+            self.imageLabel.setImage(None)
+
     def removeTask(self, deleteFile=False):
         UnifiedDownloadService.removeFailedTask(self.task, deleteFile)
         self.deleted.emit(self.task)
@@ -1,14 +1,46 @@
 from abc import ABC, abstractmethod, ABCMeta
 import logging
+import time
+from collections import deque
+from functools import lru_cache
+from threading import Lock
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, Dict, List, Protocol
 from datetime import datetime
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QTimer, QMetaMethod
 
 from ..common.database.entity.task import Task, TaskStatus, TaskType
 from ..common.database import getTaskService
 from ..common.signal_bus import signalBus
 from ..common.concurrent import TaskExecutor, Future, FutureFailed
+from ..common.utils import removeFile
+
+class Cleanable(Protocol):
+    """退出时需要清理资源的服务"""
+
+    def cleanup(self) -> None: ...
+
+
+def cleanupServices(services: List["BaseService"], timeout: float = 1.0):
+    """
+    并行清理多个服务：先让所有服务停止排队任务，再在同一个截止时间内等待
+
+    总等待时间不超过 timeout，与服务数量无关；超时仍在运行的线程池不再阻塞退出
+    """
+    for service in services:
+        service.shutdown()
+
+    deadline = time.monotonic() + timeout
+    for service in services:
+        remaining = max(0, int((deadline - time.monotonic()) * 1000))
+        service.waitForDone(remaining)
+
+
+@lru_cache(maxsize=1)
+def _busTaskUpdatedMethod() -> QMetaMethod:
+    """全局信号总线 taskUpdated 的元方法（用于检查是否有连接）"""
+    return QMetaMethod.fromSignal(signalBus.taskUpdated)
+
 
 # 创建组合元类，解决 QObject 和 ABC 的元类冲突
 class QABCMeta(type(QObject), ABCMeta):
@@ -20,9 +52,12 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
     
     # 定义信号
     logGenerated = Signal(str, str)  # level, message
+    logsGenerated = Signal(list)  # [(level, message), ...]
     taskCreated = Signal(Task)
     taskUpdated = Signal(Task)
     taskFinished = Signal(Task, bool, str)  # task, success, error_msg
+
+    _logFlushRequested = Signal()  # 工作线程请求主线程合并发送日志
     
     def __init__(self, service_type: TaskType):
         super().__init__()
@@ -35,7 +70,31 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
         self.futures = {}  # 任务ID -> Future映射
         
         self._available = False
-        self.log_cache = []  # 日志缓存
+        self._taskUpdatedMethod = QMetaMethod.fromSignal(self.taskUpdated)
+        self.log_cache = deque(maxlen=5000)  # 日志缓存（仅保留最近 5000 条）
+
+        # 日志合并：各线程写入待发送列表，主线程每 100ms 批量发射一次
+        self._pendingLogs = []
+        self._logLock = Lock()
+        self._logTimer = QTimer(self)
+        self._logTimer.setSingleShot(True)
+        self._logTimer.setInterval(100)
+        self._logTimer.timeout.connect(self._flushLogs)
+        self._logFlushRequested.connect(self._startLogTimer)
+
+        # 进度写库合并：进度变化只记录待保存任务，由定时器批量提交到数据库服务的写库线程
+        self._pendingSave: Dict[str, Task] = {}  # 任务ID -> 待保存任务
+        self._saveTimer = QTimer(self)
+        self._saveTimer.setSingleShot(True)
+        self._saveTimer.setInterval(500)
+        self._saveTimer.timeout.connect(self._flushPendingSaves)
+
+        # 进度信号合并：50ms 内同一任务的多次进度变化只发射一次更新信号
+        self._progressDirty: Dict[str, Task] = {}  # 任务ID -> 进度已变化的任务
+        self._progressTimer = QTimer(self)
+        self._progressTimer.setSingleShot(True)
+        self._progressTimer.setInterval(50)
+        self._progressTimer.timeout.connect(self._flushProgress)
 
     @abstractmethod
     def isAvailable(self) -> bool:
@@ -68,8 +127,7 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
     def restart(self, task: Task) -> bool:
         """重启任务 - 通用实现"""
         # 先取消现有任务
-        if task.id in self.futures:
-            del self.futures[task.id]
+        self.futures.pop(task.id, None)
         
         # 重置任务状态
         task.status = TaskStatus.PENDING
@@ -78,23 +136,21 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
         task.startTime = None
         task.endTime = None
 
-        # 保存到数据库
-        self.db.save_task(task)
+        # 保存到数据库（与 start 中的状态变化合并为一次写入）
+        self._scheduleSave(task)
 
         # 开始任务
         return self.start(task)
 
     def cancel(self, task: Task) -> bool:
         """取消任务 - 通用实现"""
-        if task.id in self.futures:
-            future = self.futures[task.id]
-            
-            # 注意：TaskExecutor.cancelTask 目前可能不稳定
-            # 直接从字典中移除即可
-            del self.futures[task.id]
-            
+        # 注意：TaskExecutor.cancelTask 目前可能不稳定
+        # 直接从字典中移除即可
+        if self.futures.pop(task.id, None) is not None:
             task.status = TaskStatus.CANCELLED
-            self.db.save_task(task)
+            # 终止状态立即提交
+            self._scheduleSave(task)
+            self._flushPendingSaves()
             self._emit_task_updated(task)
             
             self._addLog("INFO", f"任务已取消: {task.name}")
@@ -102,25 +158,109 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
         else:
             return False
 
+    def deleteOutputFiles(self, tasks: List[Task]) -> Future:
+        """
+        批量删除多个任务的全部输出文件（outputPath 及 outputPaths），删除在线程池中一次完成，不阻塞界面
+        
+        Args:
+            tasks: 任务对象列表
+            
+        Returns:
+            Future，结果为删除了输出文件的任务列表
+        """
+        # 文件列表在主线程中收集，工作线程只做文件操作
+        files = [(task, list(dict.fromkeys(filter(None, [task.outputPath, *task.outputPaths]))))
+                 for task in tasks]
+
+        def remove_all():
+            removed = []
+            for task, paths in files:
+                # 逐个删除，某个文件删除失败不影响同一任务的其他文件
+                if [path for path in paths if removeFile(path)]:
+                    removed.append(task)
+            return removed
+
+        def on_removed(removed: List[Task]):
+            # 在主线程中执行，与进度写库合并为一次提交
+            for task in removed:
+                task.outputPath = None
+                task.outputPaths = []
+                self._scheduleSave(task)
+
+            self._addLog("INFO", f"已删除 {len(removed)}/{len(tasks)} 个任务的输出文件")
+
+        future = self.asyncRun(remove_all)
+        future.result.connect(on_removed)
+        future.failed.connect(lambda error: self._addLog("ERROR", f"批量删除文件失败: {error}"))
+        return future
+
+    def shutdown(self):
+        """丢弃排队中的任务，并提交尚未保存的任务（不等待运行中的任务）"""
+        self.futures.clear()
+        self.executor.threadPool.clear()
+
+        # 提交剩余的待保存任务（由数据库服务退出时等待写入完成）
+        self._flushPendingSaves()
+
+        self._logTimer.stop()
+        self._flushLogs()
+
+    def waitForDone(self, msecs: int) -> bool:
+        """
+        等待运行中的任务结束（应在 shutdown 之后调用），完成后释放线程池
+        
+        Returns:
+            超时前全部结束返回 True，否则记录警告并返回 False
+        """
+        if not self.executor.threadPool.waitForDone(msecs):
+            self.logger.warning("退出时仍有任务在运行，跳过等待")
+            return False
+
+        self.executor.deleteLater()
+        return True
+
     def cleanup(self):
         """清理所有任务 - 通用实现"""
-        self.futures.clear()
-        if hasattr(self, 'executor'):
-            self.executor.deleteLater()
+        self.shutdown()
+        self.waitForDone(1000)
         
     def showLog(self):
         """显示日志"""
         signalBus.switchToTaskInterfaceSig.emit(self.service_type)
 
     def _addLog(self, level: str, message: str):
-        """添加日志"""
-        self.log_cache.append((level, message))
-        self.logger.log(getattr(logging, level.upper(), logging.INFO), message)
-        
+        """添加日志（可在工作线程中调用，写入日志记录器推迟到主线程批量进行）"""
+        with self._logLock:
+            self._pendingLogs.append((level, message))
+            isFirst = len(self._pendingLogs) == 1
+
+        # 仅在批次的第一条日志时请求发送，其余日志随同一批次发出
+        if isFirst:
+            self._logFlushRequested.emit()
+
+    def _startLogTimer(self):
+        if not self._logTimer.isActive():
+            self._logTimer.start()
+
+    def _flushLogs(self):
+        """批量发射待发送的日志"""
+        with self._logLock:
+            logs, self._pendingLogs = self._pendingLogs, []
+
+        if not logs:
+            return
+
+        self.log_cache.extend(logs)
+        for level, message in logs:
+            self.logger.log(getattr(logging, level.upper(), logging.INFO), message)
+
         # 发射通用信号
-        self.logGenerated.emit(level, message)
+        self.logsGenerated.emit(logs)
+        for level, message in logs:
+            self.logGenerated.emit(level, message)
+
         # 同时发射到全局信号总线
-        signalBus.logGenerated.emit(self.service_type, level, message)
+        signalBus.logsGenerated.emit(self.service_type, logs)
 
     def _emit_task_created(self, task: Task):
         """发射任务创建信号"""
@@ -128,9 +268,11 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
         signalBus.taskCreated.emit(self.service_type, task)
 
     def _emit_task_updated(self, task: Task):
-        """发射任务更新信号"""
-        self.taskUpdated.emit(task)
-        signalBus.taskUpdated.emit(self.service_type, task)
+        """发射任务更新信号（没有连接的信号跳过发射）"""
+        if self.isSignalConnected(self._taskUpdatedMethod):
+            self.taskUpdated.emit(task)
+        if signalBus.isSignalConnected(_busTaskUpdatedMethod()):
+            signalBus.taskUpdated.emit(self.service_type, task)
 
     def _emit_task_finished(self, task: Task, success: bool, error_msg: str = ""):
         """发射任务完成信号"""
@@ -142,12 +284,23 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
         task.progress = progress
         task.speed = speed
         task.eta = eta
-        self.db.save_task(task)
-        self._emit_task_updated(task)
+        self._scheduleSave(task)
+
+        self._progressDirty[task.id] = task
+        if not self._progressTimer.isActive():
+            self._progressTimer.start()
+
+    def _flushProgress(self):
+        """发射所有进度已变化任务的更新信号（仅最新状态）"""
+        tasks = list(self._progressDirty.values())
+        self._progressDirty.clear()
+        for task in tasks:
+            self._emit_task_updated(task)
 
     def _onWorkerFinished(self, task: Task, success: bool, error_msg: str = ""):
         """处理任务完成 - 子类可以重写"""
         task.endTime = datetime.now()
+        self._progressDirty.pop(task.id, None)  # 完成信号已携带最终状态
         
         if success:
             task.status = TaskStatus.SUCCESS
@@ -158,10 +311,41 @@ class BaseService(QObject, ABC, metaclass=QABCMeta):
             task.errorMsg = error_msg
             self._addLog("ERROR", f"任务失败: {task.name} - {error_msg}")
         
-        self.db.save_task(task)
+        # 任务结束时立即提交，连同尚未写入的进度一起保存
+        self._pendingSave[task.id] = task
+        self._flushPendingSaves()
         self._emit_task_finished(task, success, error_msg)
         
         # 清理 future
-        if task.id in self.futures:
-            del self.futures[task.id]
+        self.futures.pop(task.id, None)
+
+    def _scheduleSave(self, task: Task):
+        """记录待保存的任务，500ms 内的多次变化只写库一次"""
+        self._pendingSave[task.id] = task
+        if not self._saveTimer.isActive():
+            self._saveTimer.start()
+
+    def _flushPendingSaves(self):
+        """在主线程中生成待保存任务的行数据快照，提交到线程池写库"""
+        self._saveTimer.stop()
+        if not self._pendingSave:
+            return
+
+        tasks = list(self._pendingSave.values())
+        self._pendingSave.clear()
+
+        # 任务对象只在主线程读写，写库线程只接触序列化后的行数据
+        now = datetime.now()
+        rows = []
+        for task in tasks:
+            task.updateTime = now
+            rows.append(task.toDict())
+
+        future = self.db.saveRowsAsync(rows)
+        future.result.connect(lambda _: self._onTasksSaved(tasks))
+        future.failed.connect(lambda error: self._addLog("ERROR", f"批量保存任务失败: {error}"))
 
+    def _onTasksSaved(self, tasks: List[Task]):
+        """写库完成（主线程）：发射任务保存信号"""
+        for task in tasks:
+            self.db.taskSaved.emit(task)
@@ -1,4 +1,6 @@
+import os
 import logging
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Optional, Callable
 from datetime import datetime
@@ -8,6 +10,19 @@ from ...common.database.entity.task import Task, TaskStatus, TaskType
 from ..base_service import BaseService
 from ...common.database import getTaskService
 from ...common.signal_bus import signalBus
+from ...common.utils import removeFile, showInFolder
+
+
+_DOWNLOAD_TYPE = TaskType.DOWNLOAD.value     # 下载任务类型值
+_COVER_SUFFIXES = ('.jpg', '.webp', '.png')   # 下载器保存在视频旁的封面图片格式
+
+
+@lru_cache(maxsize=8)
+def ensureOutputDir(folder: str) -> Path:
+    """创建并返回输出目录的绝对路径，同一目录只创建一次（目录变化时缓存键随之变化）"""
+    path = Path(os.path.abspath(folder))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
 
 
 class BaseDownloadService(BaseService):
@@ -17,8 +32,15 @@ class BaseDownloadService(BaseService):
     taskUpdated = Signal(Task)   # 任务更新信号
     logGenerated = Signal(str, str)   # 日志生成信号
 
+    # 工作线程报告进度，排队到主线程处理：task, progress, speed, eta
+    _progressReported = Signal(Task, float, str, str)
+
+    SOURCE = ""         # 任务来源标识，对应 Task.source
+    URL_PATTERN = ""    # 匹配本服务支持链接的正则表达式
+
     def __init__(self):
         super().__init__(TaskType.DOWNLOAD)
+        self._progressReported.connect(self._onWorkerProgress)
         
     def isAvailable(self) -> bool:
         """
@@ -80,19 +102,43 @@ class BaseDownloadService(BaseService):
         # 基本的 URL 格式检查
         return url.startswith(('http://', 'https://', 'BV'))
     
+    def _newTask(self, url: str, video_id: str, **kwargs) -> Task:
+        """
+        创建、保存并自动开始下载任务（子类 createTask 的通用部分）
+        
+        Args:
+            url: 保存到任务中的下载链接
+            video_id: 视频ID，用作默认文件名
+            **kwargs: 任务配置
+        """
+        task = Task(
+            type=_DOWNLOAD_TYPE,
+            status=TaskStatus.PENDING,
+            url=url,
+            source=self.SOURCE,
+            fileName=f"{video_id}.mp4",
+            config=kwargs
+        )
+        
+        # 保存到数据库并发出任务创建信号
+        self._scheduleSave(task)
+        self.taskCreated.emit(task)
+        
+        # 自动开始任务
+        self.start(task)
+        
+        return task
+    
     def _createDownloadTask(self, task_func: Callable, task: Task) -> bool:
         """
-        通用的下载任务创建逻辑（辅助方法）
+        通用的下载任务创建逻辑：更新任务状态并提交到线程池
         
         Args:
-            task_func: 要在线程池中执行的下载函数
+            task_func: 要在线程池中执行的下载函数，返回下载文件的路径
             task: 任务对象
             
         Returns:
             True 表示任务成功提交到线程池
-            
-        Note:
-            这是一个内部辅助方法，子类可以选择使用它来简化代码
         """
         if task.id in self.futures:
             self._addLog("WARNING", f"任务已在运行: {task.fileName}")
@@ -101,11 +147,13 @@ class BaseDownloadService(BaseService):
         # 更新任务状态
         task.status = TaskStatus.RUNNING
         task.startTime = datetime.now()
-        self.db.save_task(task)
+        self._scheduleSave(task)
         self._emit_task_updated(task)
         
-        # 使用 TaskExecutor 异步执行
+        # 使用 TaskExecutor 异步执行，回调在主线程中执行
         future = self.asyncRun(task_func)
+        future.result.connect(partial(self._handleDownloadSuccess, task))
+        future.failed.connect(partial(self._handleDownloadFailure, task))
         
         # 保存 Future 引用
         self.futures[task.id] = future
@@ -122,6 +170,14 @@ class BaseDownloadService(BaseService):
         """
         task.outputPath = output_path
         task.progress = 100.0
+
+        # 下载器把封面保存在视频旁（同名图片），记录到任务上供卡片显示
+        stem = os.path.splitext(output_path)[0]
+        cover = next((stem + suffix for suffix in _COVER_SUFFIXES
+                      if os.path.isfile(stem + suffix)), None)
+        if cover:
+            task.coverPath = cover
+
         self._onWorkerFinished(task, True, "下载完成")
     
     def _handleDownloadFailure(self, task: Task, error):
@@ -172,7 +228,6 @@ class BaseDownloadService(BaseService):
             return False
         
         try:
-            from ...common.utils import showInFolder
             showInFolder(str(output_path))
             return True
         except Exception as e:
@@ -195,10 +250,9 @@ class BaseDownloadService(BaseService):
             return False
         
         try:
-            from ...common.utils import removeFile
             removeFile(str(output_path))
             task.outputPath = None
-            self.db.save_task(task)
+            self._scheduleSave(task)
             self._addLog("INFO", f"已删除文件: {output_path.name}")
             return True
         except Exception as e:
@@ -1,14 +1,24 @@
 # coding:utf-8
+import os
 import re
+import importlib.util
 import logging
+import tempfile
+import urllib.request
+from threading import Lock
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
 
-from .base_download_service import BaseDownloadService
-from ...common.database.entity.task import Task, TaskStatus, TaskType
+from .base_download_service import BaseDownloadService, ensureOutputDir
+from ...common.database.entity.task import Task
 from ...common.config import cfg
-from ...common.concurrent import Future, FutureFailed
+
+
+_BV_RE = re.compile(r'BV[\w]+')                  # BV号
+_BAD_CHARS_MAP = str.maketrans({c: ' ' for c in '.:?/\\*"<>|'})   # 文件名非法字符替换为空格
+
+# 工作目录是进程全局状态，切换期间持有此锁：B站下载因此串行进行，同一时间只下载一个视频
+_CWD_LOCK = Lock()
 
 
 class BilibiliDownloader:
@@ -16,25 +26,31 @@ class BilibiliDownloader:
     
     def __init__(self, output_dir: str = None):
         self.logger = logging.getLogger("BilibiliDownloader")
-        self.output_dir = Path(output_dir or cfg.get(cfg.saveFolder))
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensureOutputDir(str(output_dir or cfg.get(cfg.saveFolder)))
         
-        # 尝试导入 bilibili_dl
-        self.bilibili_dl_available = False
-        try:
-            from bilibili_dl.bilibili_dl.Video import Video
-            from bilibili_dl.bilibili_dl.downloader import download
-            from bilibili_dl.bilibili_dl.utils import send_request
-            from bilibili_dl.bilibili_dl.constants import URL_VIDEO_INFO
-            
-            self.Video = Video
-            self.download_func = download
-            self.send_request = send_request
-            self.URL_VIDEO_INFO = URL_VIDEO_INFO
-            self.bilibili_dl_available = True
-            self.logger.info("bilibili_dl 库加载成功")
-        except ImportError as e:
-            self.logger.warning(f"bilibili_dl 未安装: {e}")
+        # 只检查 bilibili_dl 是否已安装，真正的导入推迟到首次使用
+        self.bilibili_dl_available = importlib.util.find_spec('bilibili_dl') is not None
+        self._loaded = False
+        self._info_cache = {}   # BV号 -> 视频信息
+        if not self.bilibili_dl_available:
+            self.logger.warning("bilibili_dl 未安装")
+    
+    def _lazyImport(self):
+        """首次使用时导入 bilibili_dl 并缓存到实例上"""
+        if self._loaded:
+            return
+        
+        from bilibili_dl.bilibili_dl.Video import Video
+        from bilibili_dl.bilibili_dl.downloader import download
+        from bilibili_dl.bilibili_dl.utils import send_request
+        from bilibili_dl.bilibili_dl.constants import URL_VIDEO_INFO
+        
+        self.Video = Video
+        self.download_func = download
+        self.send_request = send_request
+        self.URL_VIDEO_INFO = URL_VIDEO_INFO
+        self._loaded = True
+        self.logger.info("bilibili_dl 库加载成功")
     
     def download(self, video_id: str, proxy: Optional[str] = None, 
                  status_callback: Optional[callable] = None) -> str:
@@ -42,8 +58,6 @@ class BilibiliDownloader:
         if not self.bilibili_dl_available:
             raise ImportError("bilibili_dl 库未安装")
         
-        import os
-        
         try:
             if not video_id.startswith('BV'):
                 raise ValueError(f"无效的B站视频ID: {video_id}")
@@ -53,32 +67,7 @@ class BilibiliDownloader:
                 status_callback("[INFO] 正在获取视频信息...")
             
             # 获取视频信息
-            res = self.send_request(self.URL_VIDEO_INFO, params={'bvid': video_id})
-            if not res:
-                raise Exception("获取视频信息失败")
-            
-            # 处理视频信息
-            is_single_video = res.get('videos', 1) == 1
-            
-            if is_single_video:
-                video_info = self.Video(
-                    bvid=res['bvid'],
-                    cid=res['cid'],
-                    title=res['title'],
-                    up_name=res['owner']['name'],
-                    cover_url=res['pic']
-                )
-                title = res['title']
-            else:
-                first_page = res['pages'][0]
-                video_info = self.Video(
-                    bvid=res['bvid'],
-                    cid=first_page['cid'],
-                    title=first_page['part'],
-                    up_name=res['owner']['name'],
-                    cover_url=first_page.get('first_frame', res['pic'])
-                )
-                title = first_page['part']
+            video_info, title = self.fetch_video_info(video_id)
             
             self.logger.info(f"视频标题: {title}")
             if status_callback:
@@ -86,23 +75,34 @@ class BilibiliDownloader:
             
             safe_title = self._sanitize_filename(title)
             
-            # 切换到输出目录进行下载
-            original_cwd = os.getcwd()
-            try:
-                os.chdir(str(self.output_dir))
-                self.download_func([video_info], False)
-                output_file = self._find_downloaded_file(safe_title)
+            # 先下载到任务独立的临时目录，完成后再原子移动到输出目录
+            with tempfile.TemporaryDirectory(dir=self.output_dir) as tmp_dir:
+                # bilibili_dl 只会下载到当前工作目录且不接受目标路径，切换目录期间持有全局锁，
+                # 因此多个 B站下载任务会串行执行（其他下载源不受影响）。
+                # 进程内其他依赖工作目录的子进程（如听写）显式指定 cwd，不受此处切换影响
+                with _CWD_LOCK:
+                    original_cwd = os.getcwd()
+                    os.chdir(tmp_dir)
+                    try:
+                        self.download_func([video_info], False)
+                    finally:
+                        os.chdir(original_cwd)
                 
-                if not output_file:
+                downloaded = self._find_downloaded_file(safe_title, tmp_dir)
+                if not downloaded:
                     raise FileNotFoundError(f"下载完成但未找到文件: {safe_title}.mp4")
                 
-                self.logger.info(f"B站视频下载完成: {output_file}")
-                if status_callback:
-                    status_callback("[INFO] 视频下载完成！")
-                
-                return str(Path(output_file).absolute())
-            finally:
-                os.chdir(original_cwd)
+                output_file = self.output_dir / downloaded.name
+                os.replace(downloaded, output_file)
+            
+            self._save_cover(video_id, output_file.with_suffix('.jpg'))
+            
+            self.logger.info(f"B站视频下载完成: {output_file}")
+            if status_callback:
+                status_callback("[INFO] 视频下载完成！")
+            
+            # 输出目录已是绝对路径，无需再解析
+            return str(output_file)
         
         except Exception as e:
             self.logger.error(f"B站视频下载失败: {e}")
@@ -110,41 +110,102 @@ class BilibiliDownloader:
                 status_callback(f"[ERROR] 下载失败: {e}")
             raise
     
+    def _save_cover(self, video_id: str, cover_file: Path):
+        """下载视频封面到视频旁（失败不影响视频下载结果）"""
+        cover_url = self._info_cache.get(video_id, {}).get('pic')
+        if not cover_url:
+            return
+        
+        # 接口返回的封面地址可能是 http 或省略协议的形式
+        if cover_url.startswith('//'):
+            cover_url = 'https:' + cover_url
+        try:
+            with urllib.request.urlopen(cover_url.replace('http://', 'https://', 1), timeout=10) as resp:
+                cover_file.write_bytes(resp.read())
+        except Exception as e:
+            self.logger.warning(f"封面下载失败: {e}")
+    
+    def fetch_video_info(self, video_id: str):
+        """
+        获取视频元数据（可在线程池中并发调用）
+        
+        Returns:
+            (Video 对象, 视频标题)
+        """
+        self._lazyImport()
+        
+        # 同一会话内视频信息基本不变，重试/重新下载时直接复用
+        res = self._info_cache.get(video_id)
+        if res is None:
+            res = self.send_request(self.URL_VIDEO_INFO, params={'bvid': video_id})
+            if not res:
+                raise Exception("获取视频信息失败")
+            self._info_cache[video_id] = res
+        
+        # 处理视频信息
+        is_single_video = res.get('videos', 1) == 1
+        
+        if is_single_video:
+            video_info = self.Video(
+                bvid=res['bvid'],
+                cid=res['cid'],
+                title=res['title'],
+                up_name=res['owner']['name'],
+                cover_url=res['pic']
+            )
+            title = res['title']
+        else:
+            first_page = res['pages'][0]
+            video_info = self.Video(
+                bvid=res['bvid'],
+                cid=first_page['cid'],
+                title=first_page['part'],
+                up_name=res['owner']['name'],
+                cover_url=first_page.get('first_frame', res['pic'])
+            )
+            title = first_page['part']
+        
+        return video_info, title
+    
     def _sanitize_filename(self, filename: str) -> str:
         """清理文件名"""
-        safe_name = re.sub(r'[.:?/\\*"<>|]', ' ', filename)
-        safe_name = re.sub(r'\s+', ' ', safe_name).strip()
-        return safe_name[:200] if len(safe_name) > 200 else safe_name
+        safe_name = ' '.join(filename.translate(_BAD_CHARS_MAP).split())
+        return safe_name[:200]
     
-    def _find_downloaded_file(self, title: str) -> Optional[Path]:
-        """查找下载的视频文件"""
-        extensions = ['.mp4', '.flv', '.avi']
-        
-        # 精确匹配
-        for ext in extensions:
-            file_path = self.output_dir / f"{title}{ext}"
-            if file_path.exists():
-                return file_path
-        
-        # 模糊匹配
-        for ext in extensions:
-            for file in self.output_dir.glob(f"*{ext}"):
-                if title in file.stem:
-                    return file
-        
-        # 返回最新文件
-        video_files = []
-        for ext in extensions:
-            video_files.extend(self.output_dir.glob(f"*{ext}"))
-        
-        if video_files:
-            return max(video_files, key=lambda p: p.stat().st_mtime)
-        
-        return None
+    def _find_downloaded_file(self, title: str, search_dir=None) -> Optional[Path]:
+        """查找下载的视频文件（单次遍历目录，默认为输出目录）"""
+        extensions = ('.mp4', '.flv', '.avi')
+        
+        fuzzy = None            # 模糊匹配
+        newest = None           # 最新文件
+        newest_mtime = -1.0
+        
+        with os.scandir(search_dir or self.output_dir) as it:
+            for entry in it:
+                stem, ext = os.path.splitext(entry.name)
+                if ext not in extensions or not entry.is_file():
+                    continue
+                
+                # 精确匹配
+                if stem == title:
+                    return Path(entry.path)
+                
+                if fuzzy is None and title in stem:
+                    fuzzy = entry.path
+                
+                mtime = entry.stat().st_mtime
+                if mtime > newest_mtime:
+                    newest, newest_mtime = entry.path, mtime
+        
+        found = fuzzy or newest
+        return Path(found) if found else None
 
 
 class BilibiliService(BaseDownloadService):
     """B站下载服务 - 使用 TaskExecutor"""
+
+    SOURCE = "bilibili"
+    URL_PATTERN = r'bilibili\.com|BV'
     
     def __init__(self):
         super().__init__()
@@ -159,38 +220,10 @@ class BilibiliService(BaseDownloadService):
             self._addLog("ERROR", f"无效的B站链接: {url}")
             return None
         
-        task = Task(
-            type=TaskType.DOWNLOAD.value,
-            status=TaskStatus.PENDING,
-            url=video_id,
-            source="bilibili",
-            fileName=f"{video_id}.mp4",
-            config=kwargs
-        )
-        
-        # 保存到数据库
-        self.db.save_task(task)
-        
-        # 发出任务创建信号
-        self.taskCreated.emit(task)
-        
-        # 自动开始任务
-        self.start(task)
-        
-        return task
+        return self._newTask(video_id, video_id, **kwargs)
     
     def start(self, task: Task) -> bool:
         """使用 TaskExecutor 开始下载任务"""
-        if task.id in self.futures:
-            self._addLog("WARNING", f"任务已在运行: {task.fileName}")
-            return False
-        
-        task.status = TaskStatus.RUNNING
-        task.startTime = datetime.now()
-        self.db.save_task(task)
-        self._emit_task_updated(task)
-        
-        # 定义下载任务函数
         def download_task():
             """在线程池中执行的下载函数"""
             def status_callback(message: str):
@@ -198,47 +231,19 @@ class BilibiliService(BaseDownloadService):
                 # Signal-Slot 机制会自动切换到主线程
                 self._addLog("INFO", message)
             
-            try:
-                output_path = self.downloader.download(
-                    task.url, 
-                    status_callback=status_callback
-                )
-                return output_path
-            except Exception as e:
-                # 在工作线程中捕获异常并抛出
-                raise e
-        
-        # 使用 TaskExecutor 异步执行
-        future = self.asyncRun(download_task)
+            return self.downloader.download(task.url, status_callback=status_callback)
         
-        # 绑定成功回调 - 会在主线程中执行
-        future.result.connect(lambda result: self._onDownloadSuccess(task, result))
-        
-        # 绑定失败回调 - 会在主线程中执行
-        future.failed.connect(lambda error: self._onDownloadFailed(task, error))
-        
-        # 保存 Future 引用
-        self.futures[task.id] = future
+        if not self._createDownloadTask(download_task, task):
+            return False
         
         self._addLog("INFO", f"开始下载B站视频: {task.url}")
         return True
     
-    def _onDownloadSuccess(self, task: Task, output_path: str):
-        """下载成功的回调 - 在主线程中执行"""
-        task.outputPath = output_path
-        task.progress = 100.0
-        self._onWorkerFinished(task, True, "下载完成")
-    
-    def _onDownloadFailed(self, task: Task, error: FutureFailed):
-        """下载失败的回调 - 在主线程中执行"""
-        error_msg = str(error.exception) if hasattr(error, 'exception') else str(error)
-        self._onWorkerFinished(task, False, error_msg)
-    
     def _extract_bv_id(self, url: str) -> Optional[str]:
         """从URL提取BV号"""
         if url.startswith('BV'):
             return url
         
         # 匹配 https://www.bilibili.com/video/BV...
-        match = re.search(r'BV[\w]+', url)
+        match = _BV_RE.search(url)
         return match.group(0) if match else None
\ No newline at end of file
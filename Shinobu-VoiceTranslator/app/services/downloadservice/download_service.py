@@ -1,8 +1,11 @@
 # coding:utf-8
+import re
 from typing import Optional
+from PySide6.QtCore import Qt
 from .bilibili_service import BilibiliService
 from .youtube_service import YouTubeService
 from .base_download_service import BaseDownloadService
+from ..base_service import cleanupServices
 from ...common.database import sqlRequest
 from ...common.database.entity import Task
 from ...common.utils import removeFile, showInFolder
@@ -15,53 +18,64 @@ class UnifiedDownloadService(BaseDownloadService):
         super().__init__()
         self.bilibili_service = BilibiliService()
         self.youtube_service = YouTubeService()
-        
-        # 连接子服务的信号
+
+        # 任务来源 -> 子服务，以及由各子服务链接规则合成的路由正则
+        self._services = {}
+        self._router = None
         for service in [self.bilibili_service, self.youtube_service]:
-            service.taskCreated.connect(self.taskCreated.emit)
-            service.taskUpdated.connect(self.taskUpdated.emit)
-            service.taskFinished.connect(self.taskFinished.emit)
-            service.logGenerated.connect(self.logGenerated.emit)
+            self.registerService(service)
+        
+        # 连接子服务的信号：信号直接转发信号，子服务信号都在主线程发射，使用直接连接
+        direct = Qt.ConnectionType.DirectConnection
+        for service in self._services.values():
+            service.taskCreated.connect(self.taskCreated, type=direct)
+            service.taskUpdated.connect(self.taskUpdated, type=direct)
+            service.taskFinished.connect(self.taskFinished, type=direct)
+            service.logGenerated.connect(self.logGenerated, type=direct)
+            service.logsGenerated.connect(self.logsGenerated, type=direct)
         
         # 服务可用性：至少一个下载器可用
         self._available = (self.bilibili_service.isAvailable() or 
                           self.youtube_service.isAvailable())
     
+    def registerService(self, service: BaseDownloadService):
+        """注册子服务，并重新编译路由正则（按注册顺序匹配）"""
+        self._services[service.SOURCE] = service
+        self._router = re.compile('|'.join(
+            f'(?P<{source}>{s.URL_PATTERN})' for source, s in self._services.items()))
+
     def createTask(self, url: str, **kwargs) -> Optional[Task]:
         """根据URL自动创建相应的下载任务"""
-        if 'bilibili.com' in url or 'BV' in url:
-            return self.bilibili_service.createTask(url, **kwargs)
-        elif 'youtube.com' in url or 'youtu.be' in url:
-            return self.youtube_service.createTask(url, **kwargs)
-        else:
+        match = self._router.search(url)
+        if not match:
             self._addLog("ERROR", f"不支持的下载链接: {url}")
             return None
+
+        return self._services[match.lastgroup].createTask(url, **kwargs)
     
     def start(self, task: Task) -> bool:
         """开始任务"""
-        if task.source == "bilibili":
-            return self.bilibili_service.start(task)
-        elif task.source == "youtube":
-            return self.youtube_service.start(task)
-        else:
+        service = self._services.get(task.source)
+        if not service:
             self._addLog("ERROR", f"未知的任务来源: {task.source}")
             return False
+
+        return service.start(task)
     
     def restart(self, task: Task) -> bool:
         """重启任务"""
-        if task.source == "bilibili":
-            return self.bilibili_service.restart(task)
-        elif task.source == "youtube":
-            return self.youtube_service.restart(task)
-        else:
-            return False
+        service = self._services.get(task.source)
+        return service.restart(task) if service else False
     
     def cancel(self, task: Task):
         """取消任务"""
-        if task.source == "bilibili":
-            self.bilibili_service.cancel(task)
-        elif task.source == "youtube":
-            self.youtube_service.cancel(task)
+        service = self._services.get(task.source)
+        if service:
+            service.cancel(task)
+
+    def cleanup(self):
+        """清理子服务及自身的任务"""
+        cleanupServices([*self._services.values(), self])
 
 
 # 全局服务实例
@@ -1,66 +1,145 @@
 # coding:utf-8
+import os
 import logging
 import re
-from pathlib import Path
+import importlib.util
+import threading
+import time
 from typing import Optional
-from datetime import datetime
 
-from .base_download_service import BaseDownloadService
-from ...common.database.entity import Task, TaskStatus, TaskType
+from .base_download_service import BaseDownloadService, ensureOutputDir
+from ...common.database.entity import Task
 from ...common.config import cfg
-from ...common.concurrent import Future, FutureFailed
+
+
+# 匹配 youtube.com/watch?v=VIDEO_ID、youtu.be/VIDEO_ID 或 embed/VIDEO_ID
+_VIDEO_ID_RE = re.compile(r'(?:v=|/)([0-9A-Za-z_-]{11})')
 
 
 class YouTubeDownloader:
     """YouTube下载器"""
+
+    _YoutubeDL = None   # yt-dlp 的 YoutubeDL 类，首次使用时导入，所有实例共享
     
     def __init__(self, output_dir: str = None):
         self.logger = logging.getLogger("YouTubeDownloader")
-        self.output_dir = Path(output_dir or cfg.get(cfg.saveFolder))
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = ensureOutputDir(str(output_dir or cfg.get(cfg.saveFolder)))
         
-        # 检查 yt-dlp 是否可用
-        self.ytdlp_available = False
-        try:
-            import yt_dlp
-            self.YoutubeDL = yt_dlp.YoutubeDL
-            self.ytdlp_available = True
-            self.logger.info("yt-dlp 库加载成功")
-        except ImportError as e:
-            self.logger.warning(f"yt-dlp 未安装: {e}")
+        # 只检查 yt-dlp 是否已安装，真正的导入推迟到首次下载
+        self.ytdlp_available = importlib.util.find_spec('yt_dlp') is not None
+        if not self.ytdlp_available:
+            self.logger.warning("yt-dlp 未安装")
+        
+        # 所有下载共用的 yt-dlp 参数，文件名使用视频ID
+        self._ydl_base_opts = {
+            'format': 'best[ext=mp4]/best',               # 优先 mp4，与任务文件名一致
+            'merge_output_format': 'mp4',
+            'outtmpl': str(self.output_dir / "%(id)s.%(ext)s"),
+            'quiet': False,
+            'socket_timeout': 30,
+            'buffersize': 64 * 1024,                    # 写入缓冲区，减少小块写入
+            'http_chunk_size': 10 * 1024 * 1024,        # 按 10MB 分块请求
+            'concurrent_fragment_downloads': 4,         # 分片视频并发下载
+            'retries': 10,
+            'fragment_retries': 10,
+            'writethumbnail': True,                     # 封面与视频同名保存，供任务卡片显示
+        }
+        self._local = threading.local()     # 每个工作线程各自缓存 YoutubeDL 实例
+        self._instances = []                # 所有线程创建的 YoutubeDL 实例，退出时统一关闭
+        self._instancesLock = threading.Lock()
+    
+    @classmethod
+    def _loadYoutubeDL(cls):
+        """导入 yt-dlp（只导入一次）"""
+        if cls._YoutubeDL is None:
+            from yt_dlp import YoutubeDL
+            cls._YoutubeDL = YoutubeDL
+            logging.getLogger("YouTubeDownloader").info("yt-dlp 库加载成功")
+        
+        return cls._YoutubeDL
+    
+    def _getYoutubeDL(self, proxy: Optional[str]):
+        """获取当前线程的 YoutubeDL 实例（按代理区分），跨任务复用连接"""
+        instances = getattr(self._local, 'instances', None)
+        if instances is None:
+            instances = self._local.instances = {}
+        
+        ydl = instances.get(proxy)
+        if ydl is None:
+            opts = dict(self._ydl_base_opts)
+            opts['progress_hooks'] = [self._onProgress]
+            if proxy:
+                opts['proxy'] = proxy
+            ydl = instances[proxy] = self._loadYoutubeDL()(opts)
+            with self._instancesLock:
+                self._instances.append(ydl)
+        
+        return ydl
+    
+    def close(self):
+        """关闭所有缓存的 YoutubeDL 实例，释放 Cookie 和 HTTP 连接（应在下载全部结束后调用）"""
+        with self._instancesLock:
+            instances, self._instances = self._instances, []
+        
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception as e:
+                self.logger.warning(f"关闭 YoutubeDL 实例失败: {e}")
+        
+        # 各线程的缓存随之失效，之后的下载重新创建实例
+        self._local = threading.local()
+    
+    def _onProgress(self, d: dict):
+        """yt-dlp 进度钩子（工作线程），每 100ms 最多转发一次结构化进度"""
+        callback = getattr(self._local, 'progress_callback', None)
+        if callback is None or d.get('status') != 'downloading':
+            return
+        
+        now = time.monotonic()
+        if now - self._local.last_progress < 0.1:
+            return
+        
+        self._local.last_progress = now
+        total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+        callback(d.get('downloaded_bytes') or 0, total, d.get('speed') or 0.0, d.get('eta'))
     
     def download(self, url: str, proxy: str = None, 
-                 status_callback: Optional[callable] = None) -> str:
-        """下载YouTube视频"""
+                 status_callback: Optional[callable] = None,
+                 progress_callback: Optional[callable] = None) -> str:
+        """
+        下载YouTube视频
+        
+        Args:
+            progress_callback: 进度回调 (已下载字节, 总字节, 速度 B/s, 剩余秒数)
+        """
         if not self.ytdlp_available:
             raise ImportError("yt-dlp 库未安装")
         
+        self._local.progress_callback = progress_callback
+        self._local.last_progress = 0.0
         try:
             self.logger.info(f"开始下载YouTube视频: {url}")
             if status_callback:
                 status_callback("[INFO] 正在下载YouTube视频...")
             
-            # 从URL提取视频ID
-            video_id = self._extract_video_id(url)
-            output_template = str(self.output_dir / f"{video_id}.%(ext)s")
+            # 复用当前线程的 YoutubeDL 实例，保持 HTTP 连接池
+            ydl = self._getYoutubeDL(proxy)
+            info = ydl.extract_info(url, download=True)
             
-            ydl_opts = {
-                'format': 'best',
-                'outtmpl': output_template,
-                'quiet': False,
-            }
+            # yt-dlp 下载完成后会记录最终文件路径，没有时才重新生成文件名
+            downloads = info.get('requested_downloads') or [{}]
+            filename = downloads[0].get('filepath') or ydl.prepare_filename(info)
             
-            if proxy:
-                ydl_opts['proxy'] = proxy
-            
-            with self.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                filename = ydl.prepare_filename(info)
-            
-            if not Path(filename).exists():
+            # 一次 stat 同时确认文件存在且非空
+            try:
+                size = os.stat(filename).st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"下载失败: {filename}")
+            if size == 0:
+                raise IOError(f"下载的文件为空: {filename}")
             
-            self.logger.info(f"YouTube视频下载完成: {filename}")
+            self.logger.info(f"YouTube视频下载完成: {filename} ({size / 1024 / 1024:.1f} MB)")
             if status_callback:
                 status_callback("[INFO] 视频下载完成！")
             
@@ -71,100 +150,67 @@ class YouTubeDownloader:
             if status_callback:
                 status_callback(f"[ERROR] 下载失败: {e}")
             raise
+        
+        finally:
+            self._local.progress_callback = None
     
     def _extract_video_id(self, url: str) -> str:
         """从URL提取视频ID"""
-        # 匹配 youtube.com/watch?v=VIDEO_ID 或 youtu.be/VIDEO_ID
-        patterns = [
-            r'(?:v=|/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed/)([0-9A-Za-z_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        match = _VIDEO_ID_RE.search(url)
+        if match:
+            return match.group(1)
         
         # 如果没有匹配到，可能直接是视频ID
-        return url.split('/')[-1].split('?')[0]
+        return url.rsplit('/', 1)[-1].split('?', 1)[0]
 
 
 class YouTubeService(BaseDownloadService):
     """YouTube下载服务 - 使用 TaskExecutor"""
+
+    SOURCE = "youtube"
+    URL_PATTERN = r'youtube\.com|youtu\.be'
     
     def __init__(self):
         super().__init__()
         self.downloader = YouTubeDownloader()
         self._available = self.downloader.ytdlp_available
     
+    def waitForDone(self, msecs: int) -> bool:
+        """等待下载结束后关闭缓存的 YoutubeDL 实例（仍有下载在运行时不关闭）"""
+        done = super().waitForDone(msecs)
+        if done:
+            self.downloader.close()
+        return done
+    
     def createTask(self, url: str, **kwargs) -> Optional[Task]:
         """创建YouTube下载任务"""
         video_id = self.downloader._extract_video_id(url)
         
-        task = Task(
-            type=TaskType.DOWNLOAD.value,
-            status=TaskStatus.PENDING,
-            url=url,
-            source="youtube",
-            fileName=f"{video_id}.mp4",
-            config=kwargs
-        )
-        
-        self.db.save_task(task)
-        self.taskCreated.emit(task)
-        self.start(task)
-        
-        return task
+        return self._newTask(url, video_id, **kwargs)
     
     def start(self, task: Task) -> bool:
         """使用 TaskExecutor 开始下载任务"""
-        if task.id in self.futures:
-            self._addLog("WARNING", f"任务已在运行: {task.fileName}")
-            return False
-        
-        task.status = TaskStatus.RUNNING
-        task.startTime = datetime.now()
-        self.db.save_task(task)
-        self._emit_task_updated(task)
-        
-        # 定义下载任务函数
         def download_task():
             """在线程池中执行的下载函数"""
-            # 创建状态回调函数
             def status_callback(message: str):
                 # Signal-Slot 机制会自动切换到主线程
                 self._addLog("INFO", message)
             
-            # 执行下载
-            output_path = self.downloader.download(
+            def progress_callback(downloaded: int, total: int, speed: float, eta):
+                progress = downloaded * 100.0 / total if total else 0.0
+                speed_str = f"{speed / 1024 / 1024:.1f} MB/s" if speed else ""
+                eta_str = f"{int(eta)}s" if eta is not None else ""
+                self._progressReported.emit(task, progress, speed_str, eta_str)
+            
+            return self.downloader.download(
                 task.url, 
                 proxy=task.config.get('proxy'),
-                status_callback=status_callback
+                status_callback=status_callback,
+                progress_callback=progress_callback
             )
-            return output_path
-        
-        # 使用 TaskExecutor 异步执行
-        future = self.asyncRun(download_task)
-        
-        # 绑定成功回调 - 会在主线程中执行
-        future.result.connect(lambda output_path: self._onDownloadSuccess(task, output_path))
         
-        # 绑定失败回调 - 会在主线程中执行
-        future.failed.connect(lambda error: self._onDownloadFailed(task, error))
-        
-        # 保存 Future 引用
-        self.futures[task.id] = future
+        if not self._createDownloadTask(download_task, task):
+            return False
         
         self._addLog("INFO", f"开始下载YouTube视频: {task.url}")
         return True
-    
-    def _onDownloadSuccess(self, task: Task, output_path: str):
-        """下载成功的回调 - 在主线程中执行"""
-        task.outputPath = output_path
-        task.progress = 100.0
-        self._onWorkerFinished(task, True, "下载完成")
-    
-    def _onDownloadFailed(self, task: Task, error: FutureFailed):
-        """下载失败的回调 - 在主线程中执行"""
-        error_msg = str(error.exception) if hasattr(error, 'exception') else str(error)
-        self._onWorkerFinished(task, False, error_msg)
\ No newline at end of file
@@ -1,19 +1,24 @@
 # coding:utf-8
 """听写服务"""
 import os
+import codecs
 import re
+import mmap
+import wave
+import importlib.util
 import sys
 import json
 import logging
+import threading
+import shutil
 import subprocess
+from functools import partial, lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable
 from datetime import datetime
 from PySide6.QtCore import Signal
 
-import openpyxl
-from openpyxl.styles import Font, Alignment
-
 from ..common.database.entity.task import Task, TaskStatus, TaskType
 from ..common.database import getTaskService
 from .base_service import BaseService
@@ -23,9 +28,53 @@ from ..common.config import cfg
 from ..common.model_scanner import modelScanner
 
 
+# SRT 字幕块: 序号行 + 时间轴行(HH:MM:SS,mmm --> HH:MM:SS,mmm) + 文本行，块之间以空行分隔
+# 字节模式，直接在内存映射的文件上扫描；箭头两侧的空白数量不限
+_SRT_BLOCK_RE = re.compile(
+    rb'^[^\n]*\n'
+    rb'(\d{2}:\d{2}:\d{2},\d{3})[ \t]*-->[ \t]*(\d{2}:\d{2}:\d{2},\d{3})[^\n]*'
+    rb'(?:\n(?![ \t\r]*\n)(.*?))?(?=\n[ \t\r]*\n|\s*\Z)',
+    re.MULTILINE | re.DOTALL
+)
+
+def _format_srt_timestamp(seconds: float) -> str:
+    """格式化为SRT时间戳格式 HH:MM:SS,mmm（先取整为毫秒，之后只做整数运算）"""
+    total_ss, ms = divmod(round(seconds * 1000), 1000)
+    total_mm, ss = divmod(total_ss, 60)
+    hh, mm = divmod(total_mm, 60)
+    return f"{hh:02d}:{mm:02d}:{ss:02d},{ms:03d}"
+
+
+def _format_lrc_timestamp(seconds: float) -> str:
+    """格式化为LRC时间戳格式 MM:SS.mmm（分钟不进位为小时）"""
+    total_ss, ms = divmod(round(seconds * 1000), 1000)
+    mm, ss = divmod(total_ss, 60)
+    return f"{mm:02d}:{ss:02d}.{ms:03d}"
+
+
+def _srt_seconds(timestamp: str) -> float:
+    """将格式已确认的 SRT 时间戳 HH:MM:SS,mmm 转为秒数（不做校验）"""
+    return (int(timestamp[0:2]) * 3600 + int(timestamp[3:5]) * 60
+            + int(timestamp[6:8]) + int(timestamp[9:12]) / 1000.0)
+
+
+# 子进程环境变量：强制使用 UTF-8 输出，只在导入时构建一次
+_CHILD_ENV = {**os.environ, 'PYTHONIOENCODING': 'utf-8', 'PYTHONUTF8': '1'}
+
+# 启动时的工作目录：子进程固定在此目录下运行，不受其他线程临时切换工作目录（如 B站下载）影响
+_LAUNCH_DIR = os.getcwd()
+
+@lru_cache(maxsize=1)
+def _xlsx_header_style() -> tuple:
+    """XLSX 表头样式 (字体, 对齐)，所有表头单元格共用（首次导出 XLSX 时才导入 openpyxl）"""
+    from openpyxl.styles import Font, Alignment
+    return Font(bold=True), Alignment(horizontal='center')
+
+
+@lru_cache(maxsize=1)
 def get_ffmpeg_path() -> str:
     """
-    获取 ffmpeg 可执行文件路径
+    获取 ffmpeg 可执行文件路径（只查找一次）
     
     Returns:
         ffmpeg 的完整路径
@@ -42,6 +91,75 @@ def get_ffmpeg_path() -> str:
     return 'ffmpeg'
 
 
+@lru_cache(maxsize=None)
+def cuda_available() -> bool:
+    """检测是否有可用的 CUDA 设备（只检测一次）"""
+    # 安装了 ctranslate2（faster-whisper 的推理后端）时直接询问它
+    if importlib.util.find_spec('ctranslate2') is not None:
+        try:
+            import ctranslate2
+            return ctranslate2.get_cuda_device_count() > 0
+        except Exception:
+            return False
+    # 否则以 NVIDIA 驱动是否存在作为依据（whisper-faster.exe 自带 CUDA 运行库）
+    return shutil.which('nvidia-smi') is not None
+
+
+@lru_cache(maxsize=None)
+def _auto_compute_type(device: str) -> str:
+    """按设备选择计算精度：优先 int8 量化，设备不支持时依次退回（每个设备只检测一次）"""
+    preferred = (
+        ('int8_float16', 'int8_float32', 'float16', 'int8', 'float32') if device == 'cuda'
+        else ('int8', 'int8_float32', 'float32')
+    )
+    # 安装了 ctranslate2 时按设备实际支持的精度选择（如较旧的 GPU 不支持 int8_float16）
+    if importlib.util.find_spec('ctranslate2') is not None:
+        try:
+            import ctranslate2
+            supported = ctranslate2.get_supported_compute_types(device)
+            for compute_type in preferred:
+                if compute_type in supported:
+                    return compute_type
+        except Exception:
+            pass
+    return preferred[0]
+
+
+@lru_cache(maxsize=None)
+def _local_faster_whisper_model(model_dir: Path, model_name: str) -> Optional[Path]:
+    """查找本地 faster-whisper 模型目录（每个模型只查找一次），未找到时返回 None"""
+    for candidate in (model_dir / f"faster-whisper-{model_name}", model_dir / model_name):
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def resolve_whisper_concurrency(device: str) -> int:
+    """根据配置确定同时进行的进程内听写任务数（CPU 默认 1，GPU 默认 2）"""
+    concurrency = cfg.get(cfg.whisperConcurrency)
+    if concurrency == 'auto':
+        concurrency = 2 if device == 'cuda' else 1
+    return concurrency
+
+
+def resolve_whisper_device() -> tuple:
+    """
+    根据配置确定 faster-whisper 的推理设备和计算精度
+    
+    Returns:
+        (device, compute_type)，GPU 默认 int8_float16，CPU 默认 int8（设备不支持时自动退回）
+    """
+    device = cfg.get(cfg.whisperDevice)
+    if device == 'auto':
+        device = 'cuda' if cuda_available() else 'cpu'
+    
+    compute_type = cfg.get(cfg.whisperComputeType)
+    if compute_type == 'auto':
+        compute_type = _auto_compute_type(device)
+    
+    return device, compute_type
+
+
 class WhisperEngine:
     """Whisper 引擎类型"""
     GGML = "ggml"  # whisper.cpp
@@ -68,11 +186,51 @@ class TranscriptionService(BaseService):
     taskFinished = Signal(Task, bool, str)   # 任务完成信号
     logGenerated = Signal(str, str)   # 日志生成信号
     
+    _FASTER_WHISPER_BATCH_SIZE = 16   # 进程内批量推理每批的音频片段数
+    _WRITE_CHUNK_SEGMENTS = 8192      # 文本输出每次写入的字幕段数
+    
+    # 双语格式 -> 缺少翻译文件时退回的原文格式
+    _BILINGUAL_FALLBACK = {
+        OutputFormat.SRT_BILINGUAL: OutputFormat.SRT_ORIGINAL,
+        OutputFormat.TXT_BILINGUAL: OutputFormat.TXT_ORIGINAL,
+        OutputFormat.XLSX_BILINGUAL: OutputFormat.XLSX_ORIGINAL,
+    }
+    
     def __init__(self):
         super().__init__(TaskType.TRANSCRIBE)
         self._available_models = []  # 可用模型列表
         self._param_template = ""    # 参数模板
-        self._check_availability()
+        # 安装了 faster-whisper 库时在进程内批量推理，否则调用 whisper-faster.exe
+        self._faster_whisper_in_process = importlib.util.find_spec('faster_whisper') is not None
+        self._faster_whisper_pipelines = {}          # (模型来源, 设备, 精度, 并发数) -> 已加载的批量推理管线
+        self._faster_whisper_lock = threading.Lock()  # 模型加载串行进行
+        self._faster_whisper_slots = {}              # 设备 -> (并发数, 限制同时推理任务数的信号量)
+        self._available = None       # ffmpeg 是否可用，首次调用 isAvailable 时检测
+        
+        # whisper-faster 可执行文件和模型目录的位置固定，只计算一次
+        app_dir = Path(__file__).parent.parent
+        self._whisper_faster_exe = app_dir / 'common' / 'tools' / 'whisper-faster.exe'
+        self._whisper_faster_model_dir = (app_dir / 'common' / 'models' / 'whisper-faster').absolute()
+        self._whisper_faster_exe_arg = None  # 传给命令行的可执行文件绝对路径，首次构建命令时确定
+        
+        # 输出格式 -> (输出文件名后缀, 写出函数(原文段, 译文段, 输出文件, 是否包含时间戳))
+        # 原文 SRT 直接复制听写结果，不在此表中；LRC 和双语 SRT 始终包含时间戳
+        self._output_writers = {
+            OutputFormat.LRC_ORIGINAL: (
+                '.lrc', lambda segs, _, out, ts: self._srt_to_lrc(segs, out)),
+            OutputFormat.TXT_ORIGINAL: (
+                '.txt', lambda segs, _, out, ts: self._srt_to_txt(segs, out, include_timestamp=ts)),
+            OutputFormat.XLSX_ORIGINAL: (
+                '.xlsx', lambda segs, _, out, ts: self._srt_to_xlsx(segs, out, include_timestamp=ts)),
+            OutputFormat.SRT_BILINGUAL: (
+                '_bilingual.srt', lambda segs, trans, out, ts: self._merge_bilingual_srt(segs, trans, out)),
+            OutputFormat.TXT_BILINGUAL: (
+                '_bilingual.txt', lambda segs, trans, out, ts: self._merge_bilingual_txt(
+                    segs, trans, out, include_timestamp=ts)),
+            OutputFormat.XLSX_BILINGUAL: (
+                '_bilingual.xlsx', lambda segs, trans, out, ts: self._merge_bilingual_xlsx(
+                    segs, trans, out, include_timestamp=ts)),
+        }
         self._scan_models()
     
     def _scan_models(self):
@@ -100,20 +258,26 @@ class TranscriptionService(BaseService):
     def _check_availability(self):
         """检查服务依赖是否可用"""
         # 检查 ffmpeg 是否可用
-        try:
-            ffmpeg_path = get_ffmpeg_path()
-            subprocess.run([ffmpeg_path, '-version'], 
-                         capture_output=True, 
-                         check=True,
-                         creationflags=0x08000000 if sys.platform == 'win32' else 0)
+        ffmpeg_path = get_ffmpeg_path()
+        if ffmpeg_path != 'ffmpeg':
+            # 工具目录中自带的 ffmpeg 已确认存在，无需启动进程检测
             self._available = True
             self._addLog("INFO", f"听写服务已就绪 (ffmpeg: {ffmpeg_path})")
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            return
+        
+        # 在 PATH 中查找系统 ffmpeg，无需启动进程检测
+        system_ffmpeg = shutil.which(ffmpeg_path)
+        if system_ffmpeg:
+            self._available = True
+            self._addLog("INFO", f"听写服务已就绪 (ffmpeg: {system_ffmpeg})")
+        else:
             self._available = False
-            self._addLog("WARNING", f"ffmpeg 未找到，听写服务不可用 (错误: {e})")
+            self._addLog("WARNING", "ffmpeg 未找到，听写服务不可用")
     
     def isAvailable(self) -> bool:
-        """检查服务是否可用"""
+        """检查服务是否可用（首次调用时检测 ffmpeg，之后使用缓存结果）"""
+        if self._available is None:
+            self._check_availability()
         return self._available
     
     def createTask(self, input_path: str, **kwargs) -> Optional[Task]:
@@ -125,7 +289,7 @@ class TranscriptionService(BaseService):
             **kwargs: 额外参数
                 - whisper_model: Whisper 模型文件名
                 - language: 源语言（ja, en, zh 等）
-                - output_format: 输出格式
+                - output_format: 输出格式，可为单个格式或格式列表（列表时原文只解析一次，依次生成全部格式）
                     * "原文SRT" - SRT 字幕文件
                     * "双语SRT" - 双语 SRT（需配合翻译）
                     * "原文LRC" - LRC 歌词文件
@@ -159,11 +323,12 @@ class TranscriptionService(BaseService):
             inputPath=str(input_file.absolute()),
             fileName=input_file.name,
             name=f"听写: {input_file.name}",
-            config=kwargs
+            # 配置会序列化为 JSON 保存，路径统一存为字符串
+            config={k: str(v) if isinstance(v, Path) else v for k, v in kwargs.items()}
         )
         
         # 保存到数据库
-        self.db.save_task(task)
+        self._scheduleSave(task)
         self._emit_task_created(task)
         
         # 自动开始任务
@@ -181,18 +346,21 @@ class TranscriptionService(BaseService):
             self._addLog("WARNING", f"任务已在运行: {task.fileName}")
             return False
         
+        # 开始时间只取一次，日志和任务记录共用
+        now = datetime.now()
+        
         # 输出任务开始日志（会自动写入 log.txt）
         print("\n" + "#"*80)
         print(f"# 听写任务开始")
         print(f"# 任务ID: {task.id}")
         print(f"# 文件名: {task.fileName}")
-        print(f"# 开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"# 开始时间: {now.strftime('%Y-%m-%d %H:%M:%S')}")
         print("#"*80 + "\n")
         sys.stdout.flush()
         
         task.status = TaskStatus.RUNNING
-        task.startTime = datetime.now()
-        self.db.save_task(task)
+        task.startTime = now
+        self._scheduleSave(task)
         self._emit_task_updated(task)
         
         # 定义听写任务函数
@@ -224,35 +392,42 @@ class TranscriptionService(BaseService):
                 self._addLog("WARNING", "未选择 Whisper 模型，跳过听写")
                 return None
             
-            # 1. 提取音频
-            self._addLog("INFO", "正在提取音频...")
-            wav_file = self._extract_audio(input_file)
-            
-            # 2. 执行 Whisper 听写
-            self._addLog("INFO", f"正在进行语音识别...（模型: {whisper_model}）")
-            srt_file = self._run_whisper(
-                wav_file=wav_file,
-                whisper_model=whisper_model,
-                language=language,
-                task=task
-            )
+            if self._use_faster_whisper_in_process(whisper_model, task):
+                # 进程内听写：ffmpeg 解码结果经管道直接送入模型，不生成临时 WAV 文件
+                wav_file = None
+                self._addLog("INFO", f"正在进行语音识别...（模型: {whisper_model}）")
+                srt_file, segments = self._run_faster_whisper_in_process(
+                    whisper_model, input_file, language
+                )
+            else:
+                segments = None   # 由可执行文件生成的 SRT 需要重新解析
+                
+                # 1. 提取音频
+                self._addLog("INFO", "正在提取音频...")
+                wav_file = self._extract_audio(input_file)
+                
+                # 2. 执行 Whisper 听写
+                self._addLog("INFO", f"正在进行语音识别...（模型: {whisper_model}）")
+                srt_file = self._run_whisper(
+                    wav_file=wav_file,
+                    whisper_model=whisper_model,
+                    language=language,
+                    task=task
+                )
             
             # 3. 生成输出文件
             self._addLog("INFO", "正在生成输出文件...")
-            output_path = self._generate_output(
-                srt_file=srt_file,
-                output_format=output_format,
-                task=task
-            )
+            output_paths = self._generate_outputs(srt_file, task, segments)
             
-            # 4. 清理临时文件
-            if wav_file.exists():
+            # 4. 清理临时文件（直接使用输入文件时不删除）
+            if wav_file is not None and wav_file != input_file and wav_file.exists():
                 wav_file.unlink()
                 print(f"[清理] 删除临时文件: {wav_file.name}")
                 sys.stdout.flush()
             
             return {
-                'output_path': str(output_path),
+                'output_path': str(output_paths[0]),
+                'output_paths': [str(path) for path in output_paths],
                 'srt_path': str(srt_file)
             }
         
@@ -260,8 +435,8 @@ class TranscriptionService(BaseService):
         future = self.asyncRun(transcribe_task)
         
         # 绑定回调
-        future.result.connect(lambda result: self._onTranscribeSuccess(task, result))
-        future.failed.connect(lambda error: self._onTranscribeFailed(task, error))
+        future.result.connect(partial(self._onTranscribeSuccess, task))
+        future.failed.connect(partial(self._onTranscribeFailed, task))
         
         # 保存 Future 引用
         self.futures[task.id] = future
@@ -269,6 +444,54 @@ class TranscriptionService(BaseService):
         self._addLog("INFO", f"开始听写任务: {task.fileName}")
         return True
     
+    @staticmethod
+    def _run_logged(cmd: list, env: Optional[dict] = None) -> int:
+        """
+        运行子进程，将其 stdout/stderr 经管道实时转写到 sys.stdout
+        
+        sys.stdout 已被重定向为同时写控制台和 log.txt 的对象，子进程直接继承文件描述符时
+        只会写入日志文件而绕过控制台，因此由当前工作线程读取管道后统一写出。
+        
+        Returns:
+            子进程退出码
+        """
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,   # stderr 合并到同一管道，保持输出顺序
+            creationflags=0x08000000 if sys.platform == 'win32' else 0,
+            env=env,                    # 传递 UTF-8 环境变量
+            cwd=_LAUNCH_DIR             # whisper 的相对路径和模型查找都基于启动目录
+        )
+        
+        # 按块读取而不是按行迭代：进度信息以 \r 刷新同一行，逐行读取要等进程结束才能看到
+        # 增量解码器保证跨块的多字节 UTF-8 字符不被截断
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        write, flush = sys.stdout.write, sys.stdout.flush
+        with process.stdout:
+            while chunk := process.stdout.read1(8192):
+                write(decoder.decode(chunk))
+                flush()
+            write(decoder.decode(b'', final=True))
+        
+        return process.wait()
+    
+    @staticmethod
+    def _is_compliant_wav(input_file: Path) -> bool:
+        """检查文件是否已是 Whisper 所需的 16k 单声道 16 位 PCM WAV（只读取文件头）"""
+        if input_file.suffix.lower() != '.wav':
+            return False
+        try:
+            with wave.open(str(input_file), 'rb') as wav:
+                return (wav.getnchannels() == 1
+                        and wav.getframerate() == 16000
+                        and wav.getsampwidth() == 2
+                        and wav.getcomptype() == 'NONE')
+        except (wave.Error, EOFError, OSError):
+            # 非 PCM 编码（如浮点、扩展格式）或文件头损坏，交给 ffmpeg 处理
+            return False
+    
     def _extract_audio(self, input_file: Path) -> Path:
         """
         提取音频并转换为 16k 采样率的 WAV 文件
@@ -277,14 +500,23 @@ class TranscriptionService(BaseService):
             input_file: 输入文件路径
             
         Returns:
-            提取的 WAV 文件路径
+            提取的 WAV 文件路径（输入已是 16k 单声道 16 位 PCM WAV 时直接返回输入文件）
         """
+        if self._is_compliant_wav(input_file):
+            print(f"[FFmpeg] 输入已是 16k 单声道 PCM WAV，跳过音频提取: {input_file.name}")
+            sys.stdout.flush()
+            return input_file
+        
         wav_file = input_file.with_suffix('.16k.wav')
         
         ffmpeg_path = get_ffmpeg_path()
+        # 只记录警告和错误，不输出横幅和逐帧进度统计
+        # 视频输入只取音频流：视频、字幕、数据流不解码，无需硬件解码
         cmd = [
-            ffmpeg_path, '-y',
+            ffmpeg_path, '-y', '-nostdin',
+            '-hide_banner', '-nostats', '-loglevel', 'warning',
             '-i', str(input_file),
+            '-vn', '-sn', '-dn',
             '-acodec', 'pcm_s16le',
             '-ac', '1',
             '-ar', '16000',
@@ -298,25 +530,8 @@ class TranscriptionService(BaseService):
         print("="*80 + "\n")
         sys.stdout.flush()  # 立即刷新到文件
         
-        creationflags = 0x08000000 if sys.platform == 'win32' else 0
-        
-        # 设置子进程环境变量，强制使用 UTF-8
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        env['PYTHONUTF8'] = '1'
-        
-        # 关键改动：让子进程直接继承父进程的 stdout/stderr
-        # 不使用 PIPE，FFmpeg 的输出会直接写入到已重定向的 sys.stdout（即 log.txt）
-        process = subprocess.Popen(
-            cmd,
-            stdout=sys.stdout,      # 直接继承父进程的 stdout（已重定向到 log.txt）
-            stderr=sys.stdout,      # stderr 也输出到 stdout
-            creationflags=creationflags,
-            env=env                 # 传递 UTF-8 环境变量
-        )
-        
-        # 等待进程完成
-        return_code = process.wait()
+        # FFmpeg 的日志实时转写到 sys.stdout（控制台和 log.txt），并等待进程完成
+        return_code = self._run_logged(cmd, _CHILD_ENV)
         
         # 输出结果（会自动写入 log.txt）
         print("\n" + "="*80)
@@ -371,25 +586,8 @@ class TranscriptionService(BaseService):
         print("="*80 + "\n")
         sys.stdout.flush()
         
-        # 执行命令
-        creationflags = 0x08000000 if sys.platform == 'win32' else 0
-        
-        # 设置子进程环境变量，强制使用 UTF-8
-        env = os.environ.copy()
-        env['PYTHONIOENCODING'] = 'utf-8'
-        env['PYTHONUTF8'] = '1'
-        
-        # 关键改动：让子进程直接继承父进程的 stdout/stderr
-        process = subprocess.Popen(
-            cmd,
-            stdout=sys.stdout,      # 直接继承父进程的 stdout（已重定向到 log.txt）
-            stderr=sys.stdout,      # stderr 也输出到 stdout
-            creationflags=creationflags,
-            env=env                 # 传递 UTF-8 环境变量
-        )
-        
-        # 等待进程完成
-        return_code = process.wait()
+        # 执行命令：Whisper 的输出实时转写到 sys.stdout（控制台和 log.txt），并等待进程完成
+        return_code = self._run_logged(cmd, _CHILD_ENV)
         
         # 输出结果（会自动写入 log.txt）
         print("\n" + "="*80)
@@ -411,15 +609,200 @@ class TranscriptionService(BaseService):
         
         return srt_file
     
+    def _use_faster_whisper_in_process(self, whisper_model: str, task: Task) -> bool:
+        """是否在进程内运行 faster-whisper"""
+        # 进程内推理无法识别命令行形式的额外参数，设置了额外参数时仍使用可执行文件
+        return (
+            whisper_model.startswith('faster-whisper')
+            and self._faster_whisper_in_process
+            and not task.config.get('faster_whisper_params', '')
+        )
+    
+    def _decode_audio(self, input_file: Path):
+        """
+        用 ffmpeg 将输入文件解码为 16k 单声道音频，经管道读取而不写临时文件
+        
+        Returns:
+            float32 的 numpy 数组，取值范围 [-1, 1)
+        """
+        import numpy as np
+        
+        # 输入已是 16k 单声道 PCM WAV 时直接读取采样数据，不启动 ffmpeg
+        if self._is_compliant_wav(input_file):
+            print(f"[FFmpeg] 输入已是 16k 单声道 PCM WAV，跳过解码: {input_file.name}")
+            sys.stdout.flush()
+            with wave.open(str(input_file), 'rb') as wav:
+                pcm = wav.readframes(wav.getnframes())
+            return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        
+        cmd = [
+            get_ffmpeg_path(), '-nostdin',
+            '-hide_banner', '-nostats', '-loglevel', 'warning',
+            '-i', str(input_file),
+            '-vn', '-sn', '-dn',
+            '-f', 's16le',
+            '-acodec', 'pcm_s16le',
+            '-ac', '1',
+            '-ar', '16000',
+            '-'
+        ]
+        
+        print(f"[FFmpeg] 解码音频: {input_file.name}")
+        sys.stdout.flush()
+        
+        # PCM 数据走 stdout 管道；日志级别为 warning，stderr 内容很少，结束后一并输出
+        process = subprocess.run(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=0x08000000 if sys.platform == 'win32' else 0,
+            env=_CHILD_ENV,             # 与其他子进程使用相同的环境和工作目录
+            cwd=_LAUNCH_DIR
+        )
+        if process.stderr:
+            sys.stdout.write(process.stderr.decode('utf-8', errors='replace'))
+            sys.stdout.flush()
+        if process.returncode != 0 or not process.stdout:
+            raise RuntimeError(f"音频解码失败，返回码: {process.returncode}")
+        
+        return np.frombuffer(process.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+    
+    def _run_faster_whisper_in_process(self, model: str, input_file: Path,
+                                       language: str) -> tuple:
+        """
+        使用 faster-whisper 的批量推理管线在进程内听写，并写出 SRT 文件
+        
+        Returns:
+            (SRT 文件路径, 字幕段列表)，SRT 与输入文件同目录同名，
+            字幕段格式与 _parse_srt 的返回值相同，生成输出时无需再解析 SRT
+        """
+        srt_file = input_file.with_suffix('.srt')
+        
+        print("\n" + "="*80)
+        print(f"[Whisper] 开始语音识别")
+        print(f"[Whisper] 模型: {model}")
+        print(f"[Whisper] 语言: {language}")
+        print(f"[Whisper] 输入文件: {input_file.name}")
+        print("="*80 + "\n")
+        sys.stdout.flush()
+        
+        model_dir = self._whisper_faster_model_dir
+        actual_model_name = self._actual_faster_whisper_model_name(model)
+        model_path = _local_faster_whisper_model(model_dir, actual_model_name)
+        # 本地没有模型目录时按名称从 Hugging Face 下载到模型目录
+        model_source = str(model_path) if model_path else actual_model_name
+        
+        # 解码不占用推理名额，可与其他任务的推理重叠
+        audio = self._decode_audio(input_file)
+        
+        device, compute_type = resolve_whisper_device()
+        print(f"[Faster-Whisper] 进程内批量推理，模型: {model_source}")
+        print(f"[Faster-Whisper] 推理设备: {device}，计算精度: {compute_type}")
+        sys.stdout.flush()
+        
+        concurrency = resolve_whisper_concurrency(device)
+        with self._faster_whisper_lock:
+            pipeline = self._get_or_load_faster_whisper_pipeline(
+                model_source, model_dir, device, compute_type, concurrency
+            )
+            # 设置中的并发数变化时换用新的信号量，正在推理的任务仍释放到各自持有的旧信号量
+            limit, slots = self._faster_whisper_slots.get(device, (None, None))
+            if limit != concurrency:
+                slots = threading.Semaphore(concurrency)
+                self._faster_whisper_slots[device] = (concurrency, slots)
+        
+        # 多个任务共享同一个已加载的模型，同时推理的任务数受信号量限制
+        with slots:
+            segments, _ = pipeline.transcribe(
+                audio,
+                language=language,
+                batch_size=self._FASTER_WHISPER_BATCH_SIZE,
+                vad_filter=True
+            )
+            
+            # segments 是生成器，边识别边写入（推理发生在迭代时，需在信号量内完成）
+            segments = self._write_srt(segments, srt_file)
+        
+        print(f"[Whisper] 语音识别完成: {srt_file.name}")
+        sys.stdout.flush()
+        
+        return srt_file, segments
+    
+    def _get_or_load_faster_whisper_pipeline(self, model_source: str, model_dir: Path,
+                                             device: str, compute_type: str,
+                                             num_workers: int = 1):
+        """获取已加载的批量推理管线，首次使用某个模型时加载并常驻内存（需持有 _faster_whisper_lock）"""
+        key = (model_source, device, compute_type, num_workers)
+        pipeline = self._faster_whisper_pipelines.get(key)
+        if pipeline is None:
+            # 并发数变化后按新的 num_workers 重新加载，释放同一模型的旧管线（正在使用的任务仍持有引用）
+            for stale in [k for k in self._faster_whisper_pipelines if k[:3] == key[:3]]:
+                del self._faster_whisper_pipelines[stale]
+            
+            from faster_whisper import WhisperModel, BatchedInferencePipeline
+            
+            print(f"[Faster-Whisper] 加载模型: {model_source}")
+            sys.stdout.flush()
+            whisper_model = WhisperModel(
+                model_source,
+                device=device,
+                compute_type=compute_type,
+                num_workers=num_workers,    # 多线程同时调用 transcribe 时真正并行
+                download_root=str(model_dir)
+            )
+            pipeline = BatchedInferencePipeline(model=whisper_model)
+            self._faster_whisper_pipelines[key] = pipeline
+        
+        return pipeline
+    
+    def _write_srt(self, segments, srt_file: Path) -> list:
+        """
+        将识别结果（带 start/end/text 属性的字幕段）写为 SRT 文件
+        
+        Returns:
+            与 _parse_srt 格式相同的字幕段列表（跳过空文本段，与解析结果一致）
+        """
+        parsed = []
+        with open(srt_file, 'w', encoding='utf-8') as f:
+            for i, seg in enumerate(segments, 1):
+                start = _format_srt_timestamp(seg.start)
+                end = _format_srt_timestamp(seg.end)
+                text = seg.text.strip()
+                f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
+                if text:
+                    parsed.append({
+                        'start': seg.start,
+                        'end': seg.end,
+                        'start_str': start,
+                        'end_str': end,
+                        'text': text
+                    })
+        return parsed
+    
+    @staticmethod
+    def _actual_faster_whisper_model_name(model: str) -> str:
+        """从界面上的模型名称得到 faster-whisper 的实际模型名称"""
+        # 检查模型名称是否以 faster-whisper 开头
+        if model.startswith('faster-whisper-'):
+            # 去掉前缀 "faster-whisper-"（15个字符），得到实际模型名称
+            return model[15:]
+        elif model.startswith('faster-whisper'):
+            # 兼容处理：去掉 "faster-whisper" 后的内容
+            return model.replace('faster-whisper', '').lstrip('-')
+        # 直接使用模型名称
+        return model
+    
     def _prepare_whisper_cpp_command(self, model: str, wav_file: Path, 
                                      language: str, task: Task) -> list:
         """准备 whisper.cpp 命令"""
         params = task.config.get('whisper_params', '')
         
-        # 基础命令
+        # 基础命令（whisper 目录位于启动目录下，按绝对路径定位，不依赖当前工作目录）
+        whisper_dir = os.path.join(_LAUNCH_DIR, 'whisper')
         cmd = [
-            'whisper/main.exe' if sys.platform == 'win32' else 'whisper/main',
-            '-m', f'whisper/{model}',
+            os.path.join(whisper_dir, 'main.exe' if sys.platform == 'win32' else 'main'),
+            '-m', os.path.join(whisper_dir, model),
             '-l', language,
             '-f', str(wav_file.with_suffix('')),
             '-osrt'
@@ -434,60 +817,40 @@ class TranscriptionService(BaseService):
     def _prepare_faster_whisper_command(self, model: str, wav_file: Path,
                                        language: str, task: Task) -> list:
         """准备 faster-whisper 命令（使用可执行文件）"""
-        # 检查模型名称是否以 faster-whisper 开头
-        if model.startswith('faster-whisper-'):
-            # 去掉前缀 "faster-whisper-"（15个字符），得到实际模型名称
-            actual_model_name = model[15:]
-        elif model.startswith('faster-whisper'):
-            # 兼容处理：去掉 "faster-whisper" 后的内容
-            actual_model_name = model.replace('faster-whisper', '').lstrip('-')
-        else:
-            # 直接使用模型名称
-            actual_model_name = model
+        actual_model_name = self._actual_faster_whisper_model_name(model)
         
         print(f"[Faster-Whisper] 模型名称: {model}")
         print(f"[Faster-Whisper] 实际模型: {actual_model_name}")
         sys.stdout.flush()
         
-        # 获取 whisper-faster 可执行文件路径（在 tools 目录）
-        current_dir = Path(__file__).parent.parent  # app 目录
-        whisper_exe = current_dir / 'common' / 'tools' / 'whisper-faster.exe'
-        
-        # 模型目录仍在 models/whisper-faster 下
-        model_dir = current_dir / 'common' / 'models' / 'whisper-faster'
-        
-        # 检查可执行文件是否存在
-        if not whisper_exe.exists():
-            error_msg = f"未找到 whisper-faster.exe: {whisper_exe}"
-            print(f"[错误] {error_msg}")
-            sys.stdout.flush()
-            raise FileNotFoundError(error_msg)
-        
-        # 构建相对路径（从当前工作目录到 exe）
-        # 这样 PyInstaller 程序可以正确解析自己的资源
-        try:
-            relative_exe = whisper_exe.relative_to(Path.cwd())
-            exe_path = str(relative_exe)
-        except ValueError:
-            # 如果无法计算相对路径，使用绝对路径
-            exe_path = str(whisper_exe.absolute())
+        model_dir = self._whisper_faster_model_dir
+        exe_path = self._whisper_faster_exe_arg
+        if exe_path is None:
+            whisper_exe = self._whisper_faster_exe
+            
+            # 检查可执行文件是否存在
+            if not whisper_exe.exists():
+                error_msg = f"未找到 whisper-faster.exe: {whisper_exe}"
+                print(f"[错误] {error_msg}")
+                sys.stdout.flush()
+                raise FileNotFoundError(error_msg)
+            
+            # 缓存解析后的绝对路径：进程工作目录可能被临时切换，相对路径会失效
+            exe_path = str(whisper_exe.resolve())
+            self._whisper_faster_exe_arg = exe_path
         
         print(f"[Faster-Whisper] ✓ 可执行文件: {exe_path}")
         print(f"[Faster-Whisper] 模型目录: {model_dir}")
         print(f"[Faster-Whisper] 将自动输出详细的 VAD 日志")
         sys.stdout.flush()
         
-        # 检查本地是否有模型文件（仅用于提示）
-        model_path = model_dir / f"faster-whisper-{actual_model_name}"
-        if not model_path.exists():
-            # 尝试不带前缀的路径
-            model_path = model_dir / actual_model_name
-        
         # ⚠️ 重要：whisper-faster.exe 需要的是模型名称，不是完整路径
         # 它会自动在工作目录（cwd）下查找模型或从 Hugging Face 下载
         model_arg = actual_model_name
         
-        if model_path.exists() and model_path.is_dir():
+        # 检查本地是否有模型文件（仅用于提示）
+        model_path = _local_faster_whisper_model(model_dir, actual_model_name)
+        if model_path:
             print(f"[Faster-Whisper] ✓ 本地模型目录: {model_path}")
             print(f"[Faster-Whisper] 使用模型名称: {model_arg}")
         else:
@@ -495,11 +858,10 @@ class TranscriptionService(BaseService):
         
         # 构建命令参数（修正参数格式）
         # 注意：whisper-faster.exe 使用下划线（_）而非短横线（-）
-        # 使用相对路径执行，让 PyInstaller 程序正确解析自己的资源
         cmd_args = [
-            exe_path,  # 使用相对路径
+            exe_path,  # 可执行文件绝对路径
             '--model', model_arg,
-            '--model_dir', str(model_dir.absolute()),  # 指定模型所在目录
+            '--model_dir', str(model_dir),  # 指定模型所在目录
             '--language', language,
             '--output_dir', str(wav_file.parent.absolute()),  # 使用下划线
             '--output_format', 'srt',  # 指定输出格式为 srt
@@ -509,6 +871,17 @@ class TranscriptionService(BaseService):
         
         # 获取额外参数
         params = task.config.get('faster_whisper_params', '')
+        
+        # 显式指定推理设备和精度，避免可执行文件静默回退到 CPU（额外参数中已指定时以其为准）
+        device, compute_type = resolve_whisper_device()
+        device_args = []
+        if '--device' not in params:
+            device_args += ['--device', device]
+        if '--compute_type' not in params:
+            device_args += ['--compute_type', compute_type]
+        cmd_args = cmd_args[:-1] + device_args + [cmd_args[-1]]
+        self._addLog("INFO", f"Faster-Whisper 推理设备: {device}，计算精度: {compute_type}")
+        
         if params:
             # 在音频文件参数之前插入额外参数
             cmd_args = cmd_args[:-1] + params.split() + [cmd_args[-1]]
@@ -518,20 +891,61 @@ class TranscriptionService(BaseService):
         
         return cmd_args
     
-    def _generate_output(self, srt_file: Path, output_format: str, 
-                        task: Task) -> Path:
+    def _generate_outputs(self, srt_file: Path, task: Task,
+                          segments: Optional[list] = None) -> List[Path]:
+        """
+        按任务配置生成全部输出文件
+        
+        Args:
+            srt_file: SRT 文件路径
+            task: 任务对象，config 中的 output_format 可为单个格式或格式列表
+            segments: 已有的原文字幕段，为 None 时按需解析 srt_file（所有格式共用，只解析一次）
+            
+        Returns:
+            输出文件路径列表，顺序与请求的格式一致
+        """
+        output_formats = task.config.get('output_format', OutputFormat.SRT_ORIGINAL)
+        if isinstance(output_formats, str):
+            output_formats = [output_formats]
+        
+        # 缺少翻译文件时双语格式退回原文格式，先统一替换再去重，避免同一原文格式重复生成
+        translated_srt = task.config.get('translated_srt')
+        translated_segments = None
+        if any(fmt in self._BILINGUAL_FALLBACK for fmt in output_formats):
+            if translated_srt and Path(translated_srt).exists():
+                translated_segments = self._parse_srt(Path(translated_srt))
+            else:
+                self._addLog("WARNING", "未找到翻译文件，仅输出原文")
+                output_formats = [self._BILINGUAL_FALLBACK.get(fmt, fmt) for fmt in output_formats]
+        output_formats = list(dict.fromkeys(output_formats))
+        
+        # 原文和译文各只解析一次，所有格式共用
+        if segments is None and any(fmt in self._output_writers for fmt in output_formats):
+            segments = self._parse_srt(srt_file)
+        
+        return [
+            self._generate_output(srt_file, fmt, task, segments, translated_segments)
+            for fmt in output_formats
+        ]
+    
+    def _generate_output(self, srt_file: Path, output_format: str, task: Task,
+                         segments: Optional[list] = None,
+                         translated_segments: Optional[list] = None) -> Path:
         """
-        生成指定格式的输出文件
+        生成单个格式的输出文件（翻译文件检查与格式回退由 _generate_outputs 完成）
         
         Args:
             srt_file: SRT 文件路径
             output_format: 输出格式
             task: 任务对象
+            segments: 已解析的原文字幕段，为 None 时解析 srt_file
+            translated_segments: 已解析的译文字幕段（仅双语格式使用）
             
         Returns:
             输出文件路径
         """
         input_file = Path(task.inputPath)
+        parent, stem = input_file.parent, input_file.stem
         
         # 获取时间戳设置（默认为 True）
         include_timestamp = task.config.get('include_timestamp', True)
@@ -539,70 +953,25 @@ class TranscriptionService(BaseService):
         # 原文格式处理
         if output_format == OutputFormat.SRT_ORIGINAL:
             # 原文 SRT（始终包含时间戳，这是 SRT 格式的必需部分）
-            output_file = input_file.with_suffix('.srt')
+            output_file = parent / f"{stem}.srt"
             if srt_file != output_file:
-                import shutil
                 shutil.copy(srt_file, output_file)
             return output_file
         
-        elif output_format == OutputFormat.LRC_ORIGINAL:
-            # 原文 LRC（始终包含时间戳，这是 LRC 格式的必需部分）
-            output_file = input_file.with_suffix('.lrc')
-            self._srt_to_lrc(srt_file, output_file)
-            return output_file
-        
-        elif output_format == OutputFormat.TXT_ORIGINAL:
-            # 原文 TXT
-            output_file = input_file.with_suffix('.txt')
-            self._srt_to_txt(srt_file, output_file, include_timestamp=include_timestamp)
-            return output_file
-        
-        elif output_format == OutputFormat.XLSX_ORIGINAL:
-            # 原文 XLSX
-            output_file = input_file.with_suffix('.xlsx')
-            self._srt_to_xlsx(srt_file, output_file, include_timestamp=include_timestamp)
-            return output_file
-        
-        # 双语格式处理（需要翻译文件）
-        elif output_format == OutputFormat.SRT_BILINGUAL:
-            # 双语 SRT（始终包含时间戳）
-            translated_srt = task.config.get('translated_srt')
-            if not translated_srt or not Path(translated_srt).exists():
-                self._addLog("WARNING", "未找到翻译文件，仅输出原文")
-                return self._generate_output(srt_file, OutputFormat.SRT_ORIGINAL, task)
-            
-            output_file = input_file.with_name(f"{input_file.stem}_bilingual.srt")
-            self._merge_bilingual_srt(srt_file, Path(translated_srt), output_file)
-            return output_file
-        
-        elif output_format == OutputFormat.TXT_BILINGUAL:
-            # 双语 TXT
-            translated_srt = task.config.get('translated_srt')
-            if not translated_srt or not Path(translated_srt).exists():
-                self._addLog("WARNING", "未找到翻译文件，仅输出原文")
-                return self._generate_output(srt_file, OutputFormat.TXT_ORIGINAL, task)
-            
-            output_file = input_file.with_name(f"{input_file.stem}_bilingual.txt")
-            self._merge_bilingual_txt(srt_file, Path(translated_srt), output_file, 
-                                      include_timestamp=include_timestamp)
-            return output_file
-        
-        elif output_format == OutputFormat.XLSX_BILINGUAL:
-            # 双语 XLSX
-            translated_srt = task.config.get('translated_srt')
-            if not translated_srt or not Path(translated_srt).exists():
-                self._addLog("WARNING", "未找到翻译文件，仅输出原文")
-                return self._generate_output(srt_file, OutputFormat.XLSX_ORIGINAL, task)
-            
-            output_file = input_file.with_name(f"{input_file.stem}_bilingual.xlsx")
-            self._merge_bilingual_xlsx(srt_file, Path(translated_srt), output_file,
-                                       include_timestamp=include_timestamp)
-            return output_file
-        
-        else:
+        writer = self._output_writers.get(output_format)
+        if writer is None:
             # 默认返回 SRT
             self._addLog("WARNING", f"未知的输出格式: {output_format}，使用默认 SRT")
             return srt_file
+        
+        # 其余格式都基于解析后的字幕段生成
+        if segments is None:
+            segments = self._parse_srt(srt_file)
+        
+        suffix, write = writer
+        output_file = parent / f"{stem}{suffix}"
+        write(segments, translated_segments, output_file, include_timestamp)
+        return output_file
     
     def _convert_srt_format(self, task: Task, srt_file: Path) -> Dict[str, str]:
         """
@@ -615,44 +984,16 @@ class TranscriptionService(BaseService):
         Returns:
             结果字典
         """
-        output_format = task.config.get('output_format', OutputFormat.SRT_ORIGINAL)
-        
-        output_path = self._generate_output(srt_file, output_format, task)
+        output_paths = self._generate_outputs(srt_file, task)
         
         return {
-            'output_path': str(output_path),
+            'output_path': str(output_paths[0]),
+            'output_paths': [str(path) for path in output_paths],
             'srt_path': str(srt_file)
         }
     
     # ==================== 工具函数 ====================
     
-    @staticmethod
-    def _format_timestamp_srt(seconds: float) -> str:
-        """格式化为SRT时间戳格式 HH:MM:SS,mmm"""
-        total_seconds = int(seconds)
-        hh, remainder = divmod(total_seconds, 3600)
-        mm, ss = divmod(remainder, 60)
-        ms = int((seconds * 1000) % 1000)
-        return f"{hh:02d}:{mm:02d}:{ss:02d},{ms:03d}"
-    
-    @staticmethod
-    def _format_timestamp_lrc(seconds: float) -> str:
-        """格式化为LRC时间戳格式 MM:SS.mmm"""
-        total_seconds = int(seconds)
-        mm, ss = divmod(total_seconds, 60)
-        ms = int((seconds * 1000) % 1000)
-        return f"{mm:02d}:{ss:02d}.{ms:03d}"
-    
-    @staticmethod
-    def _parse_srt_timestamp(timestamp: str) -> float:
-        """解析SRT时间戳为秒数"""
-        # 格式: HH:MM:SS,mmm
-        time_parts = timestamp.replace(',', ':').split(':')
-        if len(time_parts) == 4:
-            hh, mm, ss, ms = map(int, time_parts)
-            return hh * 3600 + mm * 60 + ss + ms / 1000.0
-        return 0.0
-    
     @staticmethod
     def _get_unique_filename(filepath: Path) -> Path:
         """生成唯一的文件名，如果文件已存在则在文件名后添加数字后缀"""
@@ -663,12 +1004,28 @@ class TranscriptionService(BaseService):
         name = filepath.stem
         ext = filepath.suffix
         
+        # 只列一次目录，在内存中查找可用序号，避免逐个 stat
+        # 按不区分大小写比较，与 Windows 文件系统一致
+        existing = {entry.casefold() for entry in os.listdir(directory)}
         counter = 1
-        while True:
-            new_filepath = directory / f"{name}_{counter}{ext}"
-            if not new_filepath.exists():
-                return new_filepath
+        while f"{name}_{counter}{ext}".casefold() in existing:
             counter += 1
+        return directory / f"{name}_{counter}{ext}"
+    
+    @staticmethod
+    def _set_column_widths(ws, widths: tuple):
+        """从 A 列起依次设置列宽，一次性写入工作表的列定义"""
+        dimensions = ws.column_dimensions
+        for letter, width in zip('ABCDEFGHIJKLMNOPQRSTUVWXYZ', widths):
+            dimensions[letter].width = width
+    
+    @staticmethod
+    def _header_cell(ws, value: str):
+        """创建只写工作表的表头单元格（加粗、居中）"""
+        from openpyxl.cell import WriteOnlyCell
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font, cell.alignment = _xlsx_header_style()
+        return cell
     
     def _parse_srt(self, srt_file: Path) -> list:
         """
@@ -681,68 +1038,59 @@ class TranscriptionService(BaseService):
             - start_str: 开始时间字符串（SRT格式）
             - end_str: 结束时间字符串（SRT格式）
             - text: 字幕文本
-        """
-        segments = []
-        
-        with open(srt_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 简单的 SRT 解析
-        blocks = content.strip().split('\n\n')
-        
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) >= 3:
-                # 时间戳行
-                time_line = lines[1]
-                match = re.match(r'(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})', time_line)
-                if match:
-                    start_str, end_str = match.groups()
-                    text = '\n'.join(lines[2:])
-                    segments.append({
-                        'start': self._parse_srt_timestamp(start_str),
-                        'end': self._parse_srt_timestamp(end_str),
-                        'start_str': start_str,
-                        'end_str': end_str,
-                        'text': text
-                    })
         
-        return segments
+        同一文件（路径、修改时间、大小均未变）重复解析时直接返回缓存结果，
+        返回的列表为共享对象，调用方不应修改。
+        """
+        stat = os.stat(srt_file)
+        return _parse_srt_cached(str(srt_file), stat.st_mtime_ns, stat.st_size)
     
     # ==================== 格式转换方法 ====================
     
-    def _srt_to_lrc(self, srt_file: Path, lrc_file: Path):
-        """将 SRT 文件转换为 LRC 格式"""
-        segments = self._parse_srt(srt_file)
+    @classmethod
+    def _write_text(cls, output_file: Path, parts):
+        """
+        将逐段生成的文本写入文件
         
+        每 _WRITE_CHUNK_SEGMENTS 段拼接为一个字符串后写入一次，
+        既避免逐段调用 write，也不会为超长字幕一次性拼出整个文件内容。
+        """
+        parts = iter(parts)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            while True:
+                chunk = ''.join(islice(parts, cls._WRITE_CHUNK_SEGMENTS))
+                if not chunk:
+                    break
+                f.write(chunk)
+    
+    def _srt_to_lrc(self, segments: list, lrc_file: Path):
+        """将解析后的 SRT 字幕段写为 LRC 格式"""
         print(f"[转换] 正在生成 LRC 文件: {lrc_file.name}")
         
-        with open(lrc_file, 'w', encoding='utf-8') as f:
-            for seg in segments:
-                # 使用工具函数格式化时间戳
-                timestamp = self._format_timestamp_lrc(seg['start'])
-                f.write(f"[{timestamp}] {seg['text']}\n")
+        self._write_text(lrc_file, (
+            f"[{_format_lrc_timestamp(seg['start'])}] {seg['text']}\n"
+            for seg in segments
+        ))
         
         print(f"[转换] LRC 文件生成完成")
 
-    def _srt_to_txt(self, srt_file: Path, txt_file: Path, include_timestamp: bool = True):
-        """将 SRT 文件转换为 TXT 格式"""
-        segments = self._parse_srt(srt_file)
-        
+    def _srt_to_txt(self, segments: list, txt_file: Path, include_timestamp: bool = True):
+        """将解析后的 SRT 字幕段写为 TXT 格式"""
         print(f"[转换] 正在生成 TXT 文件: {txt_file.name}")
         
-        with open(txt_file, 'w', encoding='utf-8') as f:
-            for seg in segments:
-                if include_timestamp:
-                    f.write(f"[{seg['start_str']} --> {seg['end_str']}]\n")
-                f.write(f"{seg['text']}\n\n")
+        if include_timestamp:
+            parts = (
+                f"[{seg['start_str']} --> {seg['end_str']}]\n{seg['text']}\n\n"
+                for seg in segments
+            )
+        else:
+            parts = (f"{seg['text']}\n\n" for seg in segments)
+        self._write_text(txt_file, parts)
         
         print(f"[转换] TXT 文件生成完成")
 
-    def _srt_to_xlsx(self, srt_file: Path, xlsx_file: Path, include_timestamp: bool = True):
-        """将 SRT 文件转换为 XLSX 格式"""
-        segments = self._parse_srt(srt_file)
-        
+    def _srt_to_xlsx(self, segments: list, xlsx_file: Path, include_timestamp: bool = True):
+        """将解析后的 SRT 字幕段写为 XLSX 格式"""
         print(f"[转换] 正在生成 XLSX 文件: {xlsx_file.name}")
         
         # 避免文件重名
@@ -751,10 +1099,15 @@ class TranscriptionService(BaseService):
             print(f"[INFO] 文件重名，自动重命名为: {unique_xlsx_file.name}")
         
         try:
-            # 创建工作簿
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "字幕"
+            # openpyxl 导入较慢，只在生成 XLSX 时导入
+            import openpyxl
+            
+            # 创建只写模式工作簿，按行流式写入，不为每个单元格创建对象
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("字幕")
+            
+            # 调整列宽（只写模式下须在写入第一行之前设置）
+            self._set_column_widths(ws, (8, 15, 15, 60) if include_timestamp else (8, 60))
             
             # 根据时间戳设置设置表头
             if include_timestamp:
@@ -762,31 +1115,16 @@ class TranscriptionService(BaseService):
             else:
                 headers = ['序号', '字幕内容']
             
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal='center')
+            ws.append([self._header_cell(ws, header) for header in headers])
             
-            # 写入数据
-            for idx, seg in enumerate(segments, 1):
-                if include_timestamp:
-                    ws.cell(row=idx+1, column=1, value=idx)
-                    ws.cell(row=idx+1, column=2, value=seg['start_str'])
-                    ws.cell(row=idx+1, column=3, value=seg['end_str'])
-                    ws.cell(row=idx+1, column=4, value=seg['text'])
-                else:
-                    ws.cell(row=idx+1, column=1, value=idx)
-                    ws.cell(row=idx+1, column=2, value=seg['text'])
-            
-            # 调整列宽
+            # 写入数据（append 绑定为局部变量，循环内不再逐行查找属性）
+            append = ws.append
             if include_timestamp:
-                ws.column_dimensions['A'].width = 8
-                ws.column_dimensions['B'].width = 15
-                ws.column_dimensions['C'].width = 15
-                ws.column_dimensions['D'].width = 60
+                for idx, seg in enumerate(segments, 1):
+                    append([idx, seg['start_str'], seg['end_str'], seg['text']])
             else:
-                ws.column_dimensions['A'].width = 8
-                ws.column_dimensions['B'].width = 60
+                for idx, seg in enumerate(segments, 1):
+                    append([idx, seg['text']])
             
             # 保存
             wb.save(unique_xlsx_file)
@@ -801,46 +1139,40 @@ class TranscriptionService(BaseService):
             print(f"[ERROR] {error_msg}")
             raise RuntimeError(error_msg)
 
-    def _merge_bilingual_srt(self, original_srt: Path, translated_srt: Path, output_srt: Path):
-        """合并原文和翻译生成双语 SRT"""
-        original_segments = self._parse_srt(original_srt)
-        translated_segments = self._parse_srt(translated_srt)
-        
+    def _merge_bilingual_srt(self, original_segments: list, translated_segments: Iterable[dict],
+                             output_srt: Path):
+        """合并原文和译文字幕段生成双语 SRT"""
         print(f"[转换] 正在生成双语 SRT 文件: {output_srt.name}")
         
-        with open(output_srt, 'w', encoding='utf-8') as f:
-            for idx, (orig, trans) in enumerate(zip(original_segments, translated_segments), 1):
-                f.write(f"{idx}\n")
-                f.write(f"{orig['start_str']} --> {orig['end_str']}\n")
-                f.write(f"{orig['text']}\n")
-                f.write(f"{trans['text']}\n")
-                f.write("\n")
+        self._write_text(output_srt, (
+            f"{idx}\n{orig['start_str']} --> {orig['end_str']}\n{orig['text']}\n{trans['text']}\n\n"
+            for idx, (orig, trans) in enumerate(zip(original_segments, translated_segments), 1)
+        ))
         
         print(f"[转换] 双语 SRT 文件生成完成")
 
-    def _merge_bilingual_txt(self, original_srt: Path, translated_srt: Path, 
+    def _merge_bilingual_txt(self, original_segments: list, translated_segments: Iterable[dict],
                              output_txt: Path, include_timestamp: bool = True):
-        """合并原文和翻译生成双语 TXT"""
-        original_segments = self._parse_srt(original_srt)
-        translated_segments = self._parse_srt(translated_srt)
-        
+        """合并原文和译文字幕段生成双语 TXT"""
         print(f"[转换] 正在生成双语 TXT 文件: {output_txt.name}")
         
-        with open(output_txt, 'w', encoding='utf-8') as f:
-            for orig, trans in zip(original_segments, translated_segments):
-                if include_timestamp:
-                    f.write(f"[{orig['start_str']} --> {orig['end_str']}]\n")
-                f.write(f"原文: {orig['text']}\n")
-                f.write(f"译文: {trans['text']}\n\n")
+        if include_timestamp:
+            parts = (
+                f"[{orig['start_str']} --> {orig['end_str']}]\n原文: {orig['text']}\n译文: {trans['text']}\n\n"
+                for orig, trans in zip(original_segments, translated_segments)
+            )
+        else:
+            parts = (
+                f"原文: {orig['text']}\n译文: {trans['text']}\n\n"
+                for orig, trans in zip(original_segments, translated_segments)
+            )
+        self._write_text(output_txt, parts)
         
         print(f"[转换] 双语 TXT 文件生成完成")
 
-    def _merge_bilingual_xlsx(self, original_srt: Path, translated_srt: Path, 
+    def _merge_bilingual_xlsx(self, original_segments: list, translated_segments: Iterable[dict],
                               output_xlsx: Path, include_timestamp: bool = True):
-        """合并原文和翻译生成双语 XLSX"""
-        original_segments = self._parse_srt(original_srt)
-        translated_segments = self._parse_srt(translated_srt)
-        
+        """合并原文和译文字幕段生成双语 XLSX"""
         print(f"[转换] 正在生成双语 XLSX 文件: {output_xlsx.name}")
         
         # 避免文件重名
@@ -849,10 +1181,15 @@ class TranscriptionService(BaseService):
             print(f"[INFO] 文件重名，自动重命名为: {unique_xlsx_file.name}")
         
         try:
-            # 创建工作簿
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "双语字幕"
+            # openpyxl 导入较慢，只在生成 XLSX 时导入
+            import openpyxl
+            
+            # 创建只写模式工作簿，按行流式写入，不为每个单元格创建对象
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet("双语字幕")
+            
+            # 调整列宽（只写模式下须在写入第一行之前设置）
+            self._set_column_widths(ws, (8, 15, 15, 40, 40) if include_timestamp else (8, 40, 40))
             
             # 根据时间戳设置设置表头
             if include_timestamp:
@@ -860,35 +1197,17 @@ class TranscriptionService(BaseService):
             else:
                 headers = ['序号', 'Original（原文）', 'Translate（译文）']
             
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(horizontal='center')
+            ws.append([self._header_cell(ws, header) for header in headers])
             
             # 写入数据
-            for idx, (orig, trans) in enumerate(zip(original_segments, translated_segments), 1):
-                if include_timestamp:
-                    ws.cell(row=idx+1, column=1, value=idx)
-                    ws.cell(row=idx+1, column=2, value=orig['start_str'])
-                    ws.cell(row=idx+1, column=3, value=orig['end_str'])
-                    ws.cell(row=idx+1, column=4, value=orig['text'])
-                    ws.cell(row=idx+1, column=5, value=trans['text'])
-                else:
-                    ws.cell(row=idx+1, column=1, value=idx)
-                    ws.cell(row=idx+1, column=2, value=orig['text'])
-                    ws.cell(row=idx+1, column=3, value=trans['text'])
-            
-            # 调整列宽
+            pairs = enumerate(zip(original_segments, translated_segments), 1)
+            append = ws.append
             if include_timestamp:
-                ws.column_dimensions['A'].width = 8
-                ws.column_dimensions['B'].width = 15
-                ws.column_dimensions['C'].width = 15
-                ws.column_dimensions['D'].width = 40
-                ws.column_dimensions['E'].width = 40
+                for idx, (orig, trans) in pairs:
+                    append([idx, orig['start_str'], orig['end_str'], orig['text'], trans['text']])
             else:
-                ws.column_dimensions['A'].width = 8
-                ws.column_dimensions['B'].width = 40
-                ws.column_dimensions['C'].width = 40
+                for idx, (orig, trans) in pairs:
+                    append([idx, orig['text'], trans['text']])
             
             # 保存
             wb.save(unique_xlsx_file)
@@ -907,13 +1226,15 @@ class TranscriptionService(BaseService):
         """听写成功的回调 - 在主线程中执行"""
         if result:
             task.outputPath = result.get('output_path')
+            task.outputPaths = result.get('output_paths', [])
             task.progress = 100.0
             
             # 保存额外信息
             task.config['srt_path'] = result.get('srt_path')
             
             # 计算用时
-            elapsed_time = (datetime.now() - task.startTime).total_seconds()
+            now = datetime.now()
+            elapsed_time = (now - task.startTime).total_seconds()
             
             # 输出成功日志
             print("\n" + "#"*80)
@@ -922,7 +1243,7 @@ class TranscriptionService(BaseService):
             print(f"# 文件名: {task.fileName}")
             print(f"# 输出路径: {result.get('output_path')}")
             print(f"# 用时: {elapsed_time:.2f} 秒")
-            print(f"# 完成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"# 完成时间: {now.strftime('%Y-%m-%d %H:%M:%S')}")
             print("#"*80 + "\n")
             sys.stdout.flush()
             
@@ -944,8 +1265,61 @@ class TranscriptionService(BaseService):
         print("#"*80 + "\n")
         sys.stdout.flush()
         
+        # 失败任务可能留下不完整的字幕文件，丢弃缓存的解析结果
+        _parse_srt_cached.cache_clear()
+        
         self._onWorkerFinished(task, False, error_msg)
 
 
-# 全局服务实例
-transcriptionService = TranscriptionService()
\ No newline at end of file
+def _iter_srt(path: str):
+    """
+    逐个产出 SRT 文件中的字幕段，格式与 _parse_srt 的返回值相同
+    
+    内存映射整个文件，正则直接在页缓存上扫描，只解码匹配到的字段，
+    不构建完整的字幕段列表。
+    """
+    with open(path, 'rb') as f:
+        # 空文件无法映射
+        if not os.fstat(f.fileno()).st_size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            # 整个文件一次正则扫描，避免逐块 split 再匹配
+            for match in _SRT_BLOCK_RE.finditer(content):
+                start_str, end_str, text = match.groups()
+                if not text:
+                    continue
+                start_str = start_str.decode('ascii')
+                end_str = end_str.decode('ascii')
+                text = text.rstrip().decode('utf-8')
+                if '\r' in text:
+                    # 与文本模式读取一致，统一换行符
+                    text = text.replace('\r\n', '\n')
+                yield {
+                    # 时间戳格式已由正则保证，无需再校验
+                    'start': _srt_seconds(start_str),
+                    'end': _srt_seconds(end_str),
+                    'start_str': start_str,
+                    'end_str': end_str,
+                    'text': text
+                }
+
+
+@lru_cache(maxsize=32)
+def _parse_srt_cached(path: str, mtime_ns: int, size: int) -> list:
+    """
+    解析 SRT 文件，结果按 (路径, 修改时间, 大小) 缓存，文件变化后自动失效
+    
+    返回的列表为共享对象，调用方不应修改。
+    """
+    return list(_iter_srt(path))
+
+
+_transcription_service = None
+
+
+def getTranscriptionService(create: bool = True) -> Optional[TranscriptionService]:
+    """获取听写服务单例（首次使用时创建；create 为 False 时尚未创建则返回 None）"""
+    global _transcription_service
+    if _transcription_service is None and create:
+        _transcription_service = TranscriptionService()
+    return _transcription_service
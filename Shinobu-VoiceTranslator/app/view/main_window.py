@@ -103,20 +103,19 @@ class MainWindow(MSFluentWindow):
     
     def closeEvent(self, e):
         """窗口关闭事件 - 清理资源"""
-        # 清理下载服务的工作线程
-        try:
-            from ..services.downloadservice.download_service import downloadService
-            downloadService.cleanup()
-        except Exception as ex:
-            print(f"清理下载服务失败: {ex}")
-        
-        # 清理数据库服务的工作线程
-        try:
-            from ..common.database import getDatabaseService
-            db = getDatabaseService()
-            if hasattr(db, 'cleanup'):
-                db.cleanup()
-        except Exception as ex:
-            print(f"清理数据库服务失败: {ex}")
+        from ..services.base_service import Cleanable
+        from ..services.downloadservice.download_service import downloadService
+        from ..services.transcription_service import getTranscriptionService
+        from ..services.translation_service import translationService
+        from ..common.database import getDatabaseService
+
+        # 依次清理各服务的线程池与数据库请求（听写服务未创建过则无需清理，也不在退出时创建）
+        services: list[Cleanable] = [
+            downloadService, getTranscriptionService(create=False), translationService, getDatabaseService()]
+        for service in filter(None, services):
+            try:
+                service.cleanup()
+            except Exception as ex:
+                print(f"清理 {type(service).__name__} 失败: {ex}")
         
         super().closeEvent(e)
\ No newline at end of file
@@ -10,13 +10,13 @@ from qfluentwidgets import (Action, FluentIcon, SegmentedWidget, InfoBar, InfoBa
 
 from ..common.icon import Logo, Icon
 from ..components.interface import Interface
-from ..common.database.entity.task import Task, TaskStatus
+from ..common.database.entity.task import Task, TaskStatus, TaskType
 from ..components.task_card import (ProgressingTaskCard, Task, SuccessTaskCard, TaskCardBase, FailedTaskCard,
                                      DeleteTaskDialog)
 from ..common.signal_bus import signalBus
 from ..services.downloadservice.download_service import downloadService
 from ..services.translation_service import translationService  
-from ..services.transcription_service import transcriptionService
+from ..services.transcription_service import getTranscriptionService
 from ..common.database import sqlRequest
 from ..components.empty_status_widget import EmptyStatusWidget
 from ..common.setting import LOG_PATH
@@ -26,6 +26,15 @@ from PySide6.QtCore import QTimer
 
 
 
+def _ownerService(task: Task):
+    """获取任务所属的服务"""
+    if task.type == TaskType.TRANSLATE.value:
+        return translationService
+    if task.type == TaskType.TRANSCRIBE.value:
+        return getTranscriptionService()
+    return downloadService
+
+
 class TaskInterface(Interface):
     """任务管理界面"""
     def __init__(self, parent=None):
@@ -41,6 +50,7 @@ class TaskInterface(Interface):
         self.emptyStatusWidget = EmptyStatusWidget(
             Logo.SMILEFACE, 
             self.tr("任务列表为空"), self)                      # 空状态提示
+        transcriptionService = getTranscriptionService()
         self.SERVICE_MAP = {
             "download":{
                 "service": downloadService,
@@ -113,9 +123,16 @@ class TaskInterface(Interface):
         self.successTaskView.cardCountChanged.connect(self._updateEmptyStatus)
         self.failedTaskView.cardCountChanged.connect(self._updateEmptyStatus)
 
-        signalBus.restartTask.connect(self._restart)
+        # 信号总线与界面均位于主线程，使用直连避免事件队列往返
+        signalBus.restartTask.connect(self._restart, type=Qt.ConnectionType.DirectConnection)
 
         # 服务信号
+        signalBus.taskUpdated.connect(self._onTaskUpdated, type=Qt.ConnectionType.DirectConnection)
+
+    def _onTaskUpdated(self, serviceType, task: Task):
+        card = self.progressingTaskView.findCard(task)
+        if card:
+            card.updateProgress()
 
     def _onCurrentWidgetChanged(self, index: int):
         # 日志视图不显示 "任务列表为空" 的提示
@@ -247,13 +264,16 @@ class TaskCardView(QWidget):
 
     def addTask(self, task: Task) -> TaskCardBase:
         card = self.createCard(task)                            # 创建卡片
-        card.deleted.connect(self.removeTask)                   # 连接删除信号
-        card.checkedChanged.connect(self._onCardCheckedChanged) # 连接选中状态变化信号
+        card.deleted.connect(
+            self.removeTask, type=Qt.ConnectionType.DirectConnection)                # 连接删除信号
+        card.checkedChanged.connect(
+            self._onCardCheckedChanged, type=Qt.ConnectionType.DirectConnection)     # 连接选中状态变化信号
 
         if self.isSelectionMode:
             card.setSelectionMode(True) # 处于选择模式时，设置卡片选择模式
 
         self.vBoxLayout.insertWidget(0, card, 0, Qt.AlignmentFlag.AlignTop)     # 添加到顶部
+        card.setVisible(True)   # 复用的卡片回收时被隐藏，放入布局后再显示
         self.cards.insert(0, card)
         self.cardMap[task.id] = card    # 添加映射
 
@@ -272,8 +292,7 @@ class TaskCardView(QWidget):
         if card.isSelectionMode:
             self._onCardCheckedChanged(False)   # 更新选中计数
 
-        card.hide()
-        card.deleteLater()      # 释放内存
+        card.release()          # 放回闲置队列以便复用
 
         self.cardCountChanged.emit(self.count())    # 发出数量变化信号
 
@@ -324,9 +343,20 @@ class TaskCardView(QWidget):
         w.deleteFileCheckBox.setChecked(False)
 
         if w.exec():
-            for card in self.cards.copy():
-                if card.isChecked():
-                    card.removeTask(w.deleteFileCheckBox.isChecked())
+            cards = [card for card in self.cards if card.isChecked()]
+
+            # 输出文件按所属服务分组，在各服务的线程池中一次性批量删除，不在界面线程中逐个删除
+            if w.deleteFileCheckBox.isChecked():
+                tasksByService = {}
+                for card in cards:
+                    if not card.task.isRunning():
+                        tasksByService.setdefault(_ownerService(card.task), []).append(card.task)
+
+                for service, tasks in tasksByService.items():
+                    service.deleteOutputFiles(tasks)
+
+            for card in cards:
+                card.removeTask(False)
 
         w.deleteLater()
 
@@ -352,7 +382,7 @@ class ProgressingTaskView(TaskCardView):
         self.commandView.bar.commandButtons[0].hide()
 
     def createCard(self, task: Task):
-        return ProgressingTaskCard(task)
+        return ProgressingTaskCard.acquire(task, self)
 
 class SuccessTaskView(TaskCardView):
     """任务完成视图"""
@@ -380,7 +410,7 @@ class SuccessTaskView(TaskCardView):
         self.cardCountChanged.emit(self.count())
 
     def createCard(self, task: Task):
-        return SuccessTaskCard(task, self)
+        return SuccessTaskCard.acquire(task, self)
 
 class FailedTaskView(TaskCardView):
     """任务失败视图"""
@@ -408,7 +438,7 @@ class FailedTaskView(TaskCardView):
         self.cardCountChanged.emit(self.count())
 
     def createCard(self, task: Task):
-        return FailedTaskCard(task, self)
+        return FailedTaskCard.acquire(task, self)
 
 class LogTaskView(QWidget):
     """日志视图"""
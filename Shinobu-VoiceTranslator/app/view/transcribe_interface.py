@@ -6,7 +6,7 @@ from qfluentwidgets import ScrollArea, InfoBar, InfoBarPosition
 
 from ..components.info_card import TranscribeModeInfoCard
 from ..components.config_card import TranscribeConfigCard
-from ..services.transcription_service import transcriptionService, WhisperEngine, OutputFormat
+from ..services.transcription_service import getTranscriptionService, WhisperEngine, OutputFormat
 from ..common.signal_bus import signalBus
 from ..common.config import cfg
 
@@ -104,7 +104,7 @@ class TranscribeInterface(ScrollArea):
     def _onTranscribeButtonClicked(self):
         """听写按钮点击事件"""
         # 1. 检查服务是否可用
-        if not transcriptionService.isAvailable():
+        if not getTranscriptionService().isAvailable():
             InfoBar.error(
                 self.tr("服务不可用"),
                 self.tr("听写服务当前不可用，请确保 ffmpeg 已安装"),
@@ -149,7 +149,7 @@ class TranscribeInterface(ScrollArea):
         print(f"[听写任务] 输出格式: {output_format}")
         
         # 4. 创建听写任务
-        task = transcriptionService.createTask(
+        task = getTranscriptionService().createTask(
             input_path=self.selectedFilePath,
             whisper_model=whisper_model,
             language=language,
@@ -220,10 +220,14 @@ class TranscribeInterface(ScrollArea):
             self._onTranscribeButtonClicked
         )
         
-        # 2. 连接听写服务的信号
-        transcriptionService.taskCreated.connect(self._onTaskCreated)
-        transcriptionService.taskFinished.connect(self._onTaskFinished)
-        transcriptionService.logGenerated.connect(self._onLogGenerated)
+        # 2. 连接听写服务的信号（服务信号均在主线程发射，使用直连）
+        service = getTranscriptionService()
+        service.taskCreated.connect(
+            self._onTaskCreated, type=Qt.ConnectionType.DirectConnection)
+        service.taskFinished.connect(
+            self._onTaskFinished, type=Qt.ConnectionType.DirectConnection)
+        service.logGenerated.connect(
+            self._onLogGenerated, type=Qt.ConnectionType.DirectConnection)
         
         # 3. 可选：连接全局信号总线（如果需要跨界面通信）
         # signalBus.taskCreated.connect(...)
@@ -5,7 +5,7 @@ import platform
 from datetime import datetime
 
 from PySide6.QtCore import Qt, QTranslator # type: ignore
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QFont, QPixmapCache
 from PySide6.QtWidgets import QApplication
 from qfluentwidgets import FluentTranslator
 
@@ -46,6 +46,9 @@ if cfg.get(cfg.dpiScale) != "Auto":
 app = QApplication(sys.argv)
 app.setAttribute(Qt.AA_DontCreateNativeWidgetSiblings)
 
+# 全局图像缓存上限 32 MiB（封面、文件图标共用）
+QPixmapCache.setCacheLimit(32 * 1024)
+
 # internationalization
 locale = cfg.get(cfg.language).value
 translator = FluentTranslator(locale)